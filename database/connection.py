@@ -0,0 +1,43 @@
+"""
+Shared SQLite connection setup for the database scripts.
+"""
+
+import sqlite3
+
+# Applied to every connection right after it is opened
+PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA busy_timeout=5000;
+PRAGMA cache_size=-65536;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+PRAGMA foreign_keys=ON;
+"""
+
+# Bulk loads run with a single writer: keep the rollback journal in memory and skip
+# fsyncs until the load commits, then re-apply PRAGMAS to return to WAL
+BULK_LOAD_PRAGMAS = """
+PRAGMA journal_mode=MEMORY;
+PRAGMA synchronous=OFF;
+"""
+
+# Read-only connections skip the journal settings, which would need write access
+READ_ONLY_PRAGMAS = """
+PRAGMA busy_timeout=5000;
+PRAGMA cache_size=-65536;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=1073741824;
+PRAGMA query_only=ON;
+"""
+
+
+def connect(db_path, read_only=False, **kwargs):
+    """Open a tuned SQLite connection (autocommit; write paths use explicit BEGIN)"""
+    if read_only:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, isolation_level=None, **kwargs)
+        conn.executescript(READ_ONLY_PRAGMAS)
+        return conn
+    conn = sqlite3.connect(db_path, isolation_level=None, **kwargs)
+    conn.executescript(PRAGMAS)
+    return conn
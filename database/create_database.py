@@ -3,33 +3,65 @@ Create SQLite database from geocoded wine data.
 Run this after get_nominatim_locations.py has generated the geocoded data.
 """
 
-import json
-import sqlite3
+import orjson
+import pandas as pd
+
+from connection import BULK_LOAD_PRAGMAS, PRAGMAS, connect
+
+# Insert statements, defined once and reused for every row
+PLACE_INSERT_SQL = '''
+INSERT INTO places (
+    place, region, latitude, longitude, country,
+    source, nominatim_lat, nominatim_lon, 
+    wikipedia_lat, wikipedia_lon, distance_km
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+WINE_INSERT_SQL = '''
+INSERT INTO wines (
+    vineyard, name, rating, price, place_id, 
+    grapes, wine_style, alcohol_content, allergens, 
+    description, url, taste_light_bold, 
+    taste_smooth_tannic, taste_dry_sweet, taste_soft_acidic,
+    food_pairings
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Fields read from each scraped wine, flattened by pd.json_normalize
+WINE_SOURCE_COLUMNS = [
+    'vineyard', 'name', 'rating', 'price', 'place', 'grapes', 'wine_style',
+    'teneur_en_alcool', 'allergens', 'description', 'url',
+    'taste_characteristics_light_bold_percentage',
+    'taste_characteristics_smooth_tannic_percentage',
+    'taste_characteristics_dry_sweet_percentage',
+    'taste_characteristics_soft_acidic_percentage',
+    'food_pairings',
+]
+
+# Values inserted into the wines table, in INSERT column order (place resolved to its id)
+WINE_INSERT_COLUMNS = ['place_id' if column == 'place' else column for column in WINE_SOURCE_COLUMNS]
 
 
 def load_wine_data(filepath):
     """Load wine data from JSON file"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with open(filepath, 'rb') as f:
+        return orjson.loads(f.read())
 
 
 def load_geocoded_locations(filepath):
     """Load geocoded locations from JSON file"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with open(filepath, 'rb') as f:
+        return orjson.loads(f.read())
 
 
 def extract_country(place):
     """Extract country from place string"""
-    if place:
-        parts = place.split(',')
-        return parts[-1].strip() if parts else None
-    return None
+    return place.rpartition(',')[2].strip() if place else None
 
 
 def create_database(db_path='../data/wines.db'):
     """Create SQLite database with tables"""
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path)
     cursor = conn.cursor()
     
     # Drop existing tables to recreate
@@ -85,17 +117,8 @@ def create_database(db_path='../data/wines.db'):
 
 def populate_places(conn, geocoded_locations):
     """Populate places table"""
-    cursor = conn.cursor()
-    place_ids = {}
-    
-    for place, data in geocoded_locations.items():
-        cursor.execute('''
-        INSERT INTO places (
-            place, region, latitude, longitude, country,
-            source, nominatim_lat, nominatim_lon, 
-            wikipedia_lat, wikipedia_lon, distance_km
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+    rows = [
+        (
             place,
             data.get('region'),
             data.get('chosen_lat'),
@@ -107,68 +130,70 @@ def populate_places(conn, geocoded_locations):
             data.get('wikipedia_lat'),
             data.get('wikipedia_lon'),
             data.get('distance_km'),
-        ))
-        
-        place_ids[place] = cursor.lastrowid
+        )
+        for place, data in geocoded_locations.items()
+    ]
     
-    conn.commit()
-    return place_ids
+    conn.executemany(PLACE_INSERT_SQL, rows)
+    
+    # Read back the generated ids in one query
+    return dict(conn.execute('SELECT place, id FROM places'))
 
 
 def populate_wines(conn, wines, place_ids):
     """Populate wines table"""
-    cursor = conn.cursor()
+    # Flatten nested fields (taste_characteristics_light_bold_percentage, ...) in one pass
+    df = pd.json_normalize(wines, sep='_').reindex(columns=WINE_SOURCE_COLUMNS)
     
-    for wine in wines:
-        place = wine.get('place', '')
-        place_id = place_ids.get(place)
-        
-        # Extract rating as float
-        rating_str = wine.get('rating', '0').replace(',', '.')
-        try:
-            rating = float(rating_str)
-        except ValueError:
-            rating = None
-        
-        # Extract taste characteristics
-        taste = wine.get('taste_characteristics', {})
-        taste_light_bold = taste.get('light_bold', {}).get('percentage')
-        taste_smooth_tannic = taste.get('smooth_tannic', {}).get('percentage')
-        taste_dry_sweet = taste.get('dry_sweet', {}).get('percentage')
-        taste_soft_acidic = taste.get('soft_acidic', {}).get('percentage')
-        
-        # Extract food pairings as comma-separated string
-        food_pairings = wine.get('food_pairings', [])
-        food_pairings_str = ', '.join(food_pairings) if food_pairings else None
-        
-        cursor.execute('''
-        INSERT INTO wines (
-            vineyard, name, rating, price, place_id, 
-            grapes, wine_style, alcohol_content, allergens, 
-            description, url, taste_light_bold, 
-            taste_smooth_tannic, taste_dry_sweet, taste_soft_acidic,
-            food_pairings
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            wine.get('vineyard'),
-            wine.get('name'),
-            rating,
-            wine.get('price'),
-            place_id,
-            wine.get('grapes'),
-            wine.get('wine_style'),
-            wine.get('teneur_en_alcool'),
-            wine.get('allergens'),
-            wine.get('description'),
-            wine.get('url'),
-            taste_light_bold,
-            taste_smooth_tannic,
-            taste_dry_sweet,
-            taste_soft_acidic,
-            food_pairings_str
-        ))
+    # Ratings use a decimal comma; anything unparsable becomes NULL
+    df['rating'] = pd.to_numeric(df['rating'].fillna('0').str.replace(',', '.'), errors='coerce')
+    df['place_id'] = df['place'].fillna('').map(place_ids).astype('Int64')
     
-    conn.commit()
+    # Food pairings as comma-separated string
+    df['food_pairings'] = df['food_pairings'].map(
+        lambda pairings: ', '.join(pairings) if isinstance(pairings, list) and pairings else None
+    )
+    
+    # Plain Python values for sqlite3, with None for every missing value
+    df = df[WINE_INSERT_COLUMNS].astype(object)
+    rows = df.where(df.notna(), None).itertuples(index=False, name=None)
+    
+    conn.executemany(WINE_INSERT_SQL, rows)
+
+
+def populate_database(conn, geocoded_locations, wines):
+    """Populate places and wines tables in a single transaction"""
+    # The database is rebuilt from scratch with no other writers, so durability
+    # only matters once the load is complete
+    conn.executescript(BULK_LOAD_PRAGMAS)
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            print("Populating places...")
+            place_ids = populate_places(conn, geocoded_locations)
+            print(f"  Inserted {len(place_ids)} places")
+            
+            print("Populating wines...")
+            populate_wines(conn, wines, place_ids)
+            print(f"  Inserted {len(wines)} wines")
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+    finally:
+        conn.executescript(PRAGMAS)
+    return place_ids
+
+
+def create_indexes(conn):
+    """Create secondary indexes once the tables are loaded, then refresh planner statistics"""
+    # Covering indexes for the place joins and per-country grouping
+    # (places.place is already indexed through its UNIQUE constraint)
+    conn.execute('CREATE INDEX idx_wines_place_id_rating ON wines(place_id, rating)')
+    conn.execute('CREATE INDEX idx_places_country ON places(country)')
+    # Partial index so counting geocoded places only touches those entries
+    conn.execute('CREATE INDEX idx_places_geocoded ON places(latitude) WHERE latitude IS NOT NULL')
+    conn.execute('ANALYZE')
 
 
 def print_database_summary(conn):
@@ -199,16 +224,6 @@ def print_database_summary(conn):
     cursor.execute('SELECT COUNT(DISTINCT place_id) FROM wines WHERE place_id IS NOT NULL')
     wines_with_place = cursor.fetchone()[0]
     
-    # Count by country
-    cursor.execute('''
-        SELECT country, COUNT(*) as cnt 
-        FROM places 
-        WHERE country IS NOT NULL 
-        GROUP BY country 
-        ORDER BY cnt DESC
-    ''')
-    countries = cursor.fetchall()
-    
     print(f"\nPlaces table:")
     print(f"  Total places:           {total_places}")
     print(f"  With coordinates:       {geocoded_places}")
@@ -219,8 +234,17 @@ def print_database_summary(conn):
     print(f"  Total wines:            {total_wines}")
     print(f"  Linked to places:       {wines_with_place}")
     
+    # Count by country (only the top 5 are shown, so let SQLite stop there)
+    cursor.execute('''
+        SELECT country, COUNT(*) as cnt 
+        FROM places 
+        WHERE country IS NOT NULL 
+        GROUP BY country 
+        ORDER BY cnt DESC
+        LIMIT 5
+    ''')
     print(f"\nPlaces by country:")
-    for country, count in countries[:5]:
+    for country, count in cursor:
         print(f"  {country}: {count}")
     
     # Sample queries
@@ -230,11 +254,10 @@ def print_database_summary(conn):
         FROM wines w
         JOIN places p ON w.place_id = p.id
         WHERE w.rating IS NOT NULL
-        ORDER BY w.rating DESC
+        ORDER BY w.rating DESC, w.id
         LIMIT 5
     ''')
-    for row in cursor.fetchall():
-        name, vineyard, rating, place = row
+    for name, vineyard, rating, place in cursor:
         print(f"  {rating:.1f} - {name} ({vineyard}) - {place}")
     
     print(f"{'='*60}")
@@ -257,13 +280,10 @@ def main():
     conn = create_database()
     
     # Populate tables
-    print("Populating places...")
-    place_ids = populate_places(conn, geocoded)
-    print(f"  Inserted {len(place_ids)} places")
+    populate_database(conn, geocoded, wines)
     
-    print("Populating wines...")
-    populate_wines(conn, wines, place_ids)
-    print(f"  Inserted {len(wines)} wines")
+    # Building indexes after the bulk load is cheaper than maintaining them per row
+    create_indexes(conn)
     
     # Print summary
     print_database_summary(conn)
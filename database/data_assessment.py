@@ -3,10 +3,19 @@ Data Quality Assessment for the wines database.
 Checks for missing/null entries across all tables and columns.
 """
 
-import sqlite3
+import contextlib
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import orjson
+
+from connection import connect
+
 DB_PATH = Path("../data/wines.db")
+CACHE_PATH = DB_PATH.with_name(".data_assessment_cache.json")  # Last report and the database state it was built from
+MAX_WORKERS = 4  # Concurrent table scans, each on its own read-only connection
 
 
 def get_table_info(cursor, table_name):
@@ -15,24 +24,17 @@ def get_table_info(cursor, table_name):
     return cursor.fetchall()
 
 
-def count_nulls(cursor, table_name, column_name):
-    """Count null/empty values in a column."""
-    cursor.execute(f"""
-        SELECT 
-            COUNT(*) as total,
-            SUM(CASE WHEN {column_name} IS NULL OR {column_name} = '' THEN 1 ELSE 0 END) as missing
-        FROM {table_name}
-    """)
-    return cursor.fetchone()
-
-
 def analyze_table(cursor, table_name):
     """Analyze all columns in a table for missing values."""
     columns = get_table_info(cursor, table_name)
     
-    # Get total row count
-    cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-    total_rows = cursor.fetchone()[0]
+    # Count rows and null/empty values of every column in a single scan
+    missing_exprs = ", ".join(
+        f"SUM(CASE WHEN \"{col[1]}\" IS NULL OR \"{col[1]}\" = '' THEN 1 ELSE 0 END)"
+        for col in columns
+    )
+    cursor.execute(f"SELECT COUNT(*), {missing_exprs} FROM {table_name}")
+    total_rows, *missing_counts = cursor.fetchone()
     
     results = {
         'table': table_name,
@@ -40,9 +42,9 @@ def analyze_table(cursor, table_name):
         'columns': []
     }
     
-    for col in columns:
+    for col, missing in zip(columns, missing_counts):
         col_id, col_name, col_type, not_null, default, pk = col
-        total, missing = count_nulls(cursor, table_name, col_name)
+        total = total_rows
         
         results['columns'].append({
             'name': col_name,
@@ -57,6 +59,26 @@ def analyze_table(cursor, table_name):
     return results
 
 
+def analyze_tables(tables):
+    """Analyze several tables concurrently, returning results in table order."""
+    local = threading.local()
+    connections = []
+    
+    def analyze(table_name):
+        # Each worker thread reads through its own connection
+        if not hasattr(local, 'conn'):
+            local.conn = connect(DB_PATH, read_only=True, check_same_thread=False)
+            connections.append(local.conn)
+        return analyze_table(local.conn.cursor(), table_name)
+    
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            return list(pool.map(analyze, tables))
+    finally:
+        for conn in connections:
+            conn.close()
+
+
 def print_table_report(results):
     """Print a formatted report for a table."""
     print(f"\n{'='*70}")
@@ -82,8 +104,9 @@ def analyze_foreign_keys(cursor):
     
     # Check wines without valid place_id
     cursor.execute("""
-        SELECT COUNT(*) FROM wines 
-        WHERE place_id IS NULL OR place_id NOT IN (SELECT id FROM places)
+        SELECT COUNT(*) FROM wines w
+        LEFT JOIN places p ON w.place_id = p.id
+        WHERE p.id IS NULL
     """)
     orphan_wines = cursor.fetchone()[0]
     
@@ -99,35 +122,22 @@ def analyze_data_quality(cursor):
     print("DATA QUALITY CHECKS")
     print(f"{'='*70}")
     
-    # Rating distribution
+    # All wines statistics in a single scan
     cursor.execute("""
         SELECT 
             COUNT(*) as total,
             SUM(CASE WHEN rating IS NULL THEN 1 ELSE 0 END) as no_rating,
             AVG(rating) as avg_rating,
             MIN(rating) as min_rating,
-            MAX(rating) as max_rating
-        FROM wines
-    """)
-    row = cursor.fetchone()
-    print(f"\nRatings:")
-    print(f"  Total wines: {row[0]}")
-    print(f"  Without rating: {row[1]} ({row[1]/row[0]*100:.1f}%)")
-    print(f"  Average rating: {row[2]:.2f}" if row[2] else "  Average rating: N/A")
-    print(f"  Range: {row[3]:.1f} - {row[4]:.1f}" if row[3] else "  Range: N/A")
-    
-    # Price coverage
-    cursor.execute("""
-        SELECT 
-            COUNT(*) as total,
-            SUM(CASE WHEN price IS NULL OR price = '' THEN 1 ELSE 0 END) as no_price
+            MAX(rating) as max_rating,
+            SUM(CASE WHEN price IS NULL OR price = '' THEN 1 ELSE 0 END) as no_price,
+            SUM(CASE WHEN taste_light_bold IS NOT NULL THEN 1 ELSE 0 END) as has_taste,
+            SUM(CASE WHEN food_pairings IS NOT NULL AND food_pairings != '' THEN 1 ELSE 0 END) as has_food
         FROM wines
     """)
-    row = cursor.fetchone()
-    print(f"\nPrices:")
-    print(f"  Without price: {row[1]} / {row[0]} ({row[1]/row[0]*100:.1f}%)")
+    total_wines, no_rating, avg_rating, min_rating, max_rating, no_price, has_taste, has_food = cursor.fetchone()
     
-    # Geocoding coverage
+    # All places statistics in a single scan
     cursor.execute("""
         SELECT 
             COUNT(*) as total,
@@ -136,34 +146,33 @@ def analyze_data_quality(cursor):
             SUM(CASE WHEN source = 'wikipedia' THEN 1 ELSE 0 END) as wikipedia
         FROM places
     """)
-    row = cursor.fetchone()
+    total_places, no_coords, nominatim, wikipedia = cursor.fetchone()
+    
+    # Rating distribution
+    print(f"\nRatings:")
+    print(f"  Total wines: {total_wines}")
+    print(f"  Without rating: {no_rating} ({no_rating/total_wines*100:.1f}%)")
+    print(f"  Average rating: {avg_rating:.2f}" if avg_rating else "  Average rating: N/A")
+    print(f"  Range: {min_rating:.1f} - {max_rating:.1f}" if min_rating else "  Range: N/A")
+    
+    # Price coverage
+    print(f"\nPrices:")
+    print(f"  Without price: {no_price} / {total_wines} ({no_price/total_wines*100:.1f}%)")
+    
+    # Geocoding coverage
     print(f"\nGeocoding:")
-    print(f"  Total places: {row[0]}")
-    print(f"  Without coordinates: {row[1]} ({row[1]/row[0]*100:.1f}%)")
-    print(f"  Source - Nominatim: {row[2]} ({row[2]/row[0]*100:.1f}%)")
-    print(f"  Source - Wikipedia: {row[3]} ({row[3]/row[0]*100:.1f}%)")
+    print(f"  Total places: {total_places}")
+    print(f"  Without coordinates: {no_coords} ({no_coords/total_places*100:.1f}%)")
+    print(f"  Source - Nominatim: {nominatim} ({nominatim/total_places*100:.1f}%)")
+    print(f"  Source - Wikipedia: {wikipedia} ({wikipedia/total_places*100:.1f}%)")
     
     # Taste characteristics coverage
-    cursor.execute("""
-        SELECT 
-            COUNT(*) as total,
-            SUM(CASE WHEN taste_light_bold IS NOT NULL THEN 1 ELSE 0 END) as has_taste
-        FROM wines
-    """)
-    row = cursor.fetchone()
     print(f"\nTaste characteristics:")
-    print(f"  With taste data: {row[1]} / {row[0]} ({row[1]/row[0]*100:.1f}%)")
+    print(f"  With taste data: {has_taste} / {total_wines} ({has_taste/total_wines*100:.1f}%)")
     
     # Food pairings coverage
-    cursor.execute("""
-        SELECT 
-            COUNT(*) as total,
-            SUM(CASE WHEN food_pairings IS NOT NULL AND food_pairings != '' THEN 1 ELSE 0 END) as has_food
-        FROM wines
-    """)
-    row = cursor.fetchone()
     print(f"\nFood pairings:")
-    print(f"  With food pairings: {row[1]} / {row[0]} ({row[1]/row[0]*100:.1f}%)")
+    print(f"  With food pairings: {has_food} / {total_wines} ({has_food/total_wines*100:.1f}%)")
 
 
 def analyze_by_country(cursor):
@@ -186,31 +195,47 @@ def analyze_by_country(cursor):
     
     print(f"\n{'Country':<20} {'Places':<10} {'Wines':<10} {'Avg Rating'}")
     print("-" * 55)
-    for row in cursor.fetchall():
+    for row in cursor:
         country = row[0] or "Unknown"
         avg_rating = f"{row[3]:.2f}" if row[3] else "N/A"
         print(f"{country:<20} {row[1]:<10} {row[2]:<10} {avg_rating}")
 
 
-def main():
-    if not DB_PATH.exists():
-        raise SystemExit(f"Database not found: {DB_PATH}\nRun create_database.py first.")
-    
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
+def db_fingerprint(db_path):
+    """Size and modification time of the database file, its WAL (if any) and this script."""
+    fingerprint = []
+    # The script is included so that editing the queries or the report layout invalidates the cache
+    for path in (db_path, db_path.with_name(db_path.name + "-wal"), Path(__file__)):
+        if path.exists():
+            stat = path.stat()
+            fingerprint += [stat.st_size, stat.st_mtime_ns]
+    return fingerprint
+
+
+def load_cached_report(fingerprint):
+    """Return the cached report if it was built from the same database state."""
+    try:
+        cached = orjson.loads(CACHE_PATH.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None  # Missing, unreadable or corrupt cache: rebuild the report
+    if not isinstance(cached, dict) or cached.get('fingerprint') != fingerprint:
+        return None
+    return cached.get('report')
+
+
+def print_report(cursor):
+    """Run all analyses and print the full report."""
     print("="*70)
     print("DATA QUALITY ASSESSMENT")
     print(f"Database: {DB_PATH}")
     print("="*70)
     
-    # Get all tables
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-    tables = [row[0] for row in cursor.fetchall()]
+    # Get all tables (skipping the ANALYZE statistics tables)
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_stat%'")
+    tables = [row[0] for row in cursor]
     
-    # Analyze each table
-    for table in tables:
-        results = analyze_table(cursor, table)
+    # Analyze each table (scans run in parallel, reports print in order)
+    for results in analyze_tables(tables):
         print_table_report(results)
     
     # Additional analyses
@@ -223,21 +248,44 @@ def main():
     print("SUMMARY")
     print(f"{'='*70}")
     
-    cursor.execute("SELECT COUNT(*) FROM wines")
-    total_wines = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM places")
-    total_places = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM places WHERE latitude IS NOT NULL")
-    geocoded_places = cursor.fetchone()[0]
+    cursor.execute("""
+        SELECT 
+            (SELECT COUNT(*) FROM wines),
+            (SELECT COUNT(*) FROM places),
+            (SELECT COUNT(*) FROM places WHERE latitude IS NOT NULL)
+    """)
+    total_wines, total_places, geocoded_places = cursor.fetchone()
     
     print(f"\n  Total wines:            {total_wines}")
     print(f"  Total places:           {total_places}")
     print(f"  Geocoded places:        {geocoded_places} ({geocoded_places/total_places*100:.1f}%)")
     print(f"\n{'='*70}")
+
+
+def main():
+    if not DB_PATH.exists():
+        raise SystemExit(f"Database not found: {DB_PATH}\nRun create_database.py first.")
+    
+    # Skip all the table scans when the database has not changed since the last run
+    report = load_cached_report(db_fingerprint(DB_PATH))
+    if report is not None:
+        print(report, end="")
+        print("(cached report, database unchanged since last run)")
+        return
+    
+    conn = connect(DB_PATH, read_only=True)
+    cursor = conn.cursor()
+    
+    with contextlib.redirect_stdout(io.StringIO()) as buffer:
+        print_report(cursor)
     
     conn.close()
+    
+    report = buffer.getvalue()
+    print(report, end="")
+    
+    # Fingerprint after closing, once SQLite has finished touching the files
+    CACHE_PATH.write_bytes(orjson.dumps({"fingerprint": db_fingerprint(DB_PATH), "report": report}))
 
 
 if __name__ == "__main__":
@@ -2,7 +2,7 @@
 Simple script to query the wines database.
 """
 
-import sqlite3
+from connection import connect
 
 def show_structure(cursor):
     """Show database structure"""
@@ -11,7 +11,7 @@ def show_structure(cursor):
     print("=" * 50)
     
     # Get all tables
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_stat%'")
     tables = cursor.fetchall()
     
     for (table_name,) in tables:
@@ -33,7 +33,7 @@ def list_french_wines(cursor):
         FROM wines w
         JOIN places p ON w.place_id = p.id
         WHERE p.country = 'France'
-        ORDER BY w.rating DESC
+        ORDER BY w.rating DESC, w.id
         LIMIT 10
     ''')
     
@@ -50,7 +50,7 @@ def list_french_wines(cursor):
 
 
 def main():
-    conn = sqlite3.connect('../data/wines.db')
+    conn = connect('../data/wines.db', read_only=True)
     cursor = conn.cursor()
     
     show_structure(cursor)
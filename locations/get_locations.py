@@ -4,24 +4,62 @@ Compares both sources and chooses the best coordinates.
 Generates GeoJSON for mapping and quality assessment statistics.
 """
 
-import json
+import asyncio
+import functools
+import heapq
 import math
+import random
 import re
+import sqlite3
 import time
-import requests
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import aiohttp
+import ijson
+import numpy as np
+import orjson
+from urllib3.util.retry import Retry
+from geopy.adapters import RequestsAdapter
 from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut, GeocoderServiceError
+from geopy.exc import GeocoderRateLimited, GeocoderServiceError, GeocoderTimedOut
+from geopy.extra.rate_limiter import RateLimiter
 
 # Configuration
 DIVERGENCE_THRESHOLD_KM = 50  # Use Wikipedia if sources diverge more than this
+NOMINATIM_DOMAIN = "nominatim.openstreetmap.org"  # Point at a private instance to lift the limits below
+NOMINATIM_MIN_DELAY_SECONDS = 1.1  # Public Nominatim allows 1 request per second
+NOMINATIM_WORKERS = 1  # Concurrent Nominatim lookups, only raise (e.g. to 8) for a private instance
+NOMINATIM_MAX_BACKOFF_SECONDS = 30  # Upper bound on the wait between retries of a failed lookup
 WIKI_API = "https://en.wikipedia.org/w/api.php"
 USER_AGENT = "WineMapper/1.0"
+WIKI_MAX_CONCURRENCY = 8  # Maximum Wikipedia requests in flight at once
+WIKI_BATCH_SIZE = 50  # MediaWiki API limit on titles per query
+GEOCODE_CACHE_PATH = "../data/geocode_cache.sqlite"
+GEOCODED_PATH = "../data/geocoded_locations.json"  # Also read back to resume from a previous run
+CACHE_TTL_SECONDS = 48 * 3600  # Re-query cached lookups older than this
+CACHE_WRITE_BATCH_SIZE = 50  # Nominatim results saved to the cache per write
 
+WINE_FIELDS = ("place", "region", "name", "vineyard", "rating")  # Only wine fields used for geocoding and export
+POPUP_WINES = 5  # Top-rated wines listed per location (the map popup shows 5)
 
-def load_wine_data(filepath):
-    """Load wine data from JSON file"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+# Patterns used to clean place names
+PARENTHESES_RE = re.compile(r"\s*\(.*?\)\s*")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def iter_wines(filepath):
+    """Stream wines one at a time from the JSON file"""
+    with open(filepath, 'rb') as f:
+        yield from ijson.items(f, 'wines.item', use_float=True)
+
+
+def load_previous_results(filepath):
+    """Load geocoded locations from a previous run, if any"""
+    try:
+        with open(filepath, 'rb') as f:
+            return orjson.loads(f.read())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return {}
 
 
 def extract_unique_locations(wines):
@@ -39,100 +77,343 @@ def extract_unique_locations(wines):
     return locations
 
 
+@functools.lru_cache(maxsize=4096)
 def clean_place_label(place: str) -> str:
     """Clean place name for Wikipedia search"""
-    main = place.split(",")[0].strip()
-    main = re.sub(r"\s*\(.*?\)\s*", " ", main).strip()
-    return re.sub(r"\s+", " ", main)
+    main = place.split(",", 1)[0].strip()
+    # Most labels have no parentheses or unusual whitespace, so skip the regexes
+    if "(" not in main and "  " not in main and main.isprintable():
+        return main
+    main = PARENTHESES_RE.sub(" ", main).strip()
+    return WHITESPACE_RE.sub(" ", main)
+
+
+def normalize_place(place: str) -> str:
+    """Normalize a place name for use as a cache key (case and spacing insensitive)"""
+    return " ".join(place.lower().split())
+
+
+def parse_rating(rating):
+    """Parse a Vivino rating such as '4,5' (missing or invalid ratings sort last)"""
+    try:
+        return float(str(rating).replace(',', '.'))
+    except ValueError:
+        return -math.inf
 
 
 def haversine_km(lon1, lat1, lon2, lat2):
     """Calculate distance between two points in kilometers"""
     R = 6371.0  # Earth radius in km
-    p1, p2 = math.radians(lat1), math.radians(lat2)
-    dp = math.radians(lat2 - lat1)
-    dl = math.radians(lon2 - lon1)
-    a = (math.sin(dp / 2) ** 2 +
-         math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2)
-    return 2 * R * math.asin(math.sqrt(a))
+    sin, cos, radians, sqrt = math.sin, math.cos, math.radians, math.sqrt
+    p1, p2 = radians(lat1), radians(lat2)
+    dp = p2 - p1
+    dl = radians(lon2 - lon1)
+    a = sin(dp / 2) ** 2 + cos(p1) * cos(p2) * sin(dl / 2) ** 2
+    return 2 * R * math.atan2(sqrt(a), sqrt(1 - a))
+
+
+def haversine_km_vec(lon1, lat1, lon2, lat2):
+    """Vectorized haversine_km over NumPy arrays (NaN where a coordinate is missing)
+
+    Intermediate steps are computed in place, so only four scratch arrays
+    are allocated regardless of how many terms the formula has.
+    """
+    R = 6371.0  # Earth radius in km
+    p1 = np.radians(lat1)
+    p2 = np.radians(lat2)
+    
+    # a = sin(dp/2)^2 + cos(p1) * cos(p2) * sin(dl/2)^2
+    a = np.subtract(p2, p1)
+    a *= 0.5
+    np.sin(a, out=a)
+    a *= a
+    dl = np.radians(np.subtract(lon2, lon1))
+    dl *= 0.5
+    np.sin(dl, out=dl)
+    dl *= dl
+    np.cos(p1, out=p1)
+    np.cos(p2, out=p2)
+    p1 *= p2
+    p1 *= dl
+    a += p1
+    
+    # 2R * atan2(sqrt(a), sqrt(1 - a)), reusing p2 for the second root
+    np.subtract(1.0, a, out=p2)
+    np.sqrt(p2, out=p2)
+    np.sqrt(a, out=a)
+    np.arctan2(a, p2, out=a)
+    a *= 2 * R
+    return a
+
+
+def is_plausible_coords(lat, lon):
+    """Check that coordinates exist and fall within valid latitude/longitude bounds"""
+    return lat is not None and lon is not None and -90 <= lat <= 90 and -180 <= lon <= 180
 
 
-def get_nominatim_coords(geolocator, location_name, retry=3):
-    """Get coordinates from Nominatim"""
+def get_nominatim_coords(geocode, location_name, retry=3):
+    """Get coordinates from Nominatim (re-raises the error once all retries failed)"""
     for attempt in range(retry):
         try:
-            location = geolocator.geocode(location_name, timeout=10)
-            if location:
-                return location.latitude, location.longitude
-            return None, None
+            location = geocode(location_name, timeout=10)
         except (GeocoderTimedOut, GeocoderServiceError) as e:
             if attempt == retry - 1:
-                return None, None
-            time.sleep(2)
-    return None, None
+                raise
+            # Exponential backoff with jitter, unless a 429 says how long to wait
+            delay = min(NOMINATIM_MAX_BACKOFF_SECONDS, 2 ** attempt + random.random())
+            if isinstance(e, GeocoderRateLimited) and e.retry_after:
+                delay = e.retry_after
+            time.sleep(delay)
+            continue
+        if location and is_plausible_coords(location.latitude, location.longitude):
+            return location.latitude, location.longitude
+        return None, None
 
 
-def get_wikipedia_coords(session, place):
-    """Get coordinates from Wikipedia"""
-    canonical = clean_place_label(place)
-    try:
-        params = {
-            "action": "query",
-            "format": "json",
-            "formatversion": 2,
-            "prop": "coordinates",
-            "titles": canonical,
-            "colimit": 1,
-            "coprimary": "primary",
-        }
-        r = session.get(WIKI_API, params=params, timeout=20)
-        r.raise_for_status()
-        data = r.json()
+def get_all_nominatim_coords(geolocator, places):
+    """Get Nominatim coordinates for all places, throttled to the public usage policy"""
+    # Retries are handled by get_nominatim_coords, the limiter only spaces out calls
+    geocode = RateLimiter(geolocator.geocode, min_delay_seconds=NOMINATIM_MIN_DELAY_SECONDS,
+                          max_retries=0, swallow_exceptions=False)
+    # Runs in a worker thread, so it needs its own cache connection
+    cache = open_geocode_cache()
+    cached = load_cached_nominatim_coords(cache)
+    pending = {}
+    
+    def lookup(place):
+        """Return (coords, fetched), where fetched marks a fresh result worth caching"""
+        key = normalize_place(place)
+        if key in cached:
+            return cached[key], False
+        try:
+            return get_nominatim_coords(geocode, place), True
+        except (GeocoderTimedOut, GeocoderServiceError):
+            return (None, None), False  # Not cached, so it is retried on the next run
+    
+    total = len(places)
+    results = []
+    with ThreadPoolExecutor(max_workers=NOMINATIM_WORKERS) as pool:
+        # Lookups may overlap, but results are consumed (and cached) in order on this thread
+        for idx, (place, (coords, fetched)) in enumerate(zip(places, pool.map(lookup, places)), 1):
+            if fetched:
+                pending[normalize_place(place)] = coords
+                if len(pending) >= CACHE_WRITE_BATCH_SIZE:
+                    store_nominatim_coords(cache, pending)
+                    pending.clear()
+            results.append(coords)
+            nom_status = "OK" if coords[0] is not None else "--"
+            print(f"  [{idx}/{total}] {nom_status} {place}")
+    
+    store_nominatim_coords(cache, pending)
+    cache.close()
+    return results
 
-        page = data["query"]["pages"][0]
-        if page.get("missing") or not page.get("coordinates"):
-            return None, None, None
 
+async def get_wikipedia_coords_batch(session, semaphore, titles):
+    """Get coordinates for up to WIKI_BATCH_SIZE Wikipedia titles in one request"""
+    params = {
+        "action": "query",
+        "format": "json",
+        "formatversion": 2,
+        "prop": "coordinates",
+        "titles": "|".join(titles),
+        "colimit": "max",
+        "coprimary": "primary",
+    }
+    async with semaphore:
+        try:
+            async with session.get(WIKI_API, params=params) as r:
+                r.raise_for_status()
+                data = await r.json()
+        except Exception:
+            return {}  # Leave failed titles unresolved so they are not cached
+
+    query = data.get("query", {})
+
+    # The API answers with normalized/redirected titles, map them back
+    renamed = {}
+    for entry in query.get("normalized", []) + query.get("redirects", []):
+        renamed[entry["from"]] = entry["to"]
+
+    found = {}
+    for page in query.get("pages", []):
+        if page.get("missing") or not page.get("coordinates"):
+            continue
         coords = page["coordinates"][0]
-        return coords["lat"], coords["lon"], page["title"]
-    except Exception:
-        return None, None, None
+        if not is_plausible_coords(coords.get("lat"), coords.get("lon")):
+            continue
+        found[page["title"]] = (coords["lat"], coords["lon"], page["title"])
+
+    results = {}
+    for title in titles:
+        resolved = renamed.get(title, title)
+        resolved = renamed.get(resolved, resolved)  # Normalized, then redirected
+        results[title] = found.get(resolved, (None, None, None))
+    return results
+
+
+def open_geocode_cache(path=GEOCODE_CACHE_PATH):
+    """Open the on-disk geocoding cache, creating it if needed"""
+    cache = sqlite3.connect(path)
+    cache.execute('''
+    CREATE TABLE IF NOT EXISTS wikipedia (
+        label TEXT PRIMARY KEY,
+        lat REAL,
+        lon REAL,
+        title TEXT,
+        fetched_at INTEGER
+    )
+    ''')
+    cache.execute('''
+    CREATE TABLE IF NOT EXISTS nominatim (
+        place TEXT PRIMARY KEY,
+        lat REAL,
+        lon REAL,
+        fetched_at INTEGER
+    )
+    ''')
+    return cache
+
+
+def load_cached_nominatim_coords(cache):
+    """Load Nominatim results younger than CACHE_TTL_SECONDS, keyed by normalized place"""
+    cutoff = int(time.time()) - CACHE_TTL_SECONDS
+    rows = cache.execute(
+        'SELECT place, lat, lon FROM nominatim WHERE fetched_at > ?', (cutoff,)
+    )
+    return {place: (lat, lon) for place, lat, lon in rows}
+
+
+def store_nominatim_coords(cache, results):
+    """Save Nominatim results (including places with no match), keyed by normalized place"""
+    now = int(time.time())
+    with cache:
+        cache.executemany(
+            'INSERT OR REPLACE INTO nominatim (place, lat, lon, fetched_at) VALUES (?, ?, ?, ?)',
+            [(place, lat, lon, now) for place, (lat, lon) in results.items()],
+        )
+
+
+def load_cached_wikipedia_coords(cache):
+    """Load Wikipedia results younger than CACHE_TTL_SECONDS, keyed by label"""
+    cutoff = int(time.time()) - CACHE_TTL_SECONDS
+    rows = cache.execute(
+        'SELECT label, lat, lon, title FROM wikipedia WHERE fetched_at > ?', (cutoff,)
+    )
+    return {label: (lat, lon, title) for label, lat, lon, title in rows}
+
+
+def store_wikipedia_coords(cache, results):
+    """Save Wikipedia results (including misses) to the cache"""
+    now = int(time.time())
+    with cache:
+        cache.executemany(
+            'INSERT OR REPLACE INTO wikipedia (label, lat, lon, title, fetched_at) VALUES (?, ?, ?, ?, ?)',
+            [(label, lat, lon, title, now) for label, (lat, lon, title) in results.items()],
+        )
+
+
+async def fetch_all_wikipedia_coords(places, cache):
+    """Fetch Wikipedia coordinates for all places in concurrent batches"""
+    labels = {place: clean_place_label(place) for place in places}
+    
+    # Query each distinct label once, skipping empty labels and labels that are already cached
+    coords_by_title = load_cached_wikipedia_coords(cache)
+    titles = [label for label in dict.fromkeys(labels.values()) if label and label not in coords_by_title]
+    batches = [titles[i:i + WIKI_BATCH_SIZE] for i in range(0, len(titles), WIKI_BATCH_SIZE)]
+    
+    semaphore = asyncio.Semaphore(WIKI_MAX_CONCURRENCY)
+    headers = {"User-Agent": USER_AGENT, "Accept": "application/json"}
+    timeout = aiohttp.ClientTimeout(total=20)
+    # One pooled connection per concurrent request, kept alive across batches
+    connector = aiohttp.TCPConnector(limit_per_host=WIKI_MAX_CONCURRENCY, keepalive_timeout=30, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(headers=headers, timeout=timeout, connector=connector) as session:
+        batch_results = await asyncio.gather(
+            *(get_wikipedia_coords_batch(session, semaphore, batch) for batch in batches)
+        )
+    
+    for result in batch_results:
+        store_wikipedia_coords(cache, result)
+        coords_by_title.update(result)
+    return {place: coords_by_title.get(label, (None, None, None)) for place, label in labels.items()}
+
+
+async def fetch_all_coords(geolocator, places, cache):
+    """Run the throttled Nominatim pass in a worker thread while Wikipedia is fetched"""
+    print(f"Fetching Nominatim coordinates and Wikipedia coordinates (batches of {WIKI_BATCH_SIZE})...")
+    return await asyncio.gather(
+        asyncio.to_thread(get_all_nominatim_coords, geolocator, places),
+        fetch_all_wikipedia_coords(places, cache),
+    )
 
 
 def geocode_all_locations(locations):
     """Geocode all locations using both Nominatim and Wikipedia"""
-    geolocator = Nominatim(user_agent=USER_AGENT)
-    session = requests.Session()
-    session.headers.update({"User-Agent": USER_AGENT, "Accept": "application/json"})
+    # Keep connections alive across requests, retrying dropped connections with backoff
+    adapter_factory = functools.partial(
+        RequestsAdapter, pool_connections=1, pool_maxsize=NOMINATIM_WORKERS,
+        max_retries=Retry(total=3, backoff_factor=0.5),
+    )
+    geolocator = Nominatim(user_agent=USER_AGENT, domain=NOMINATIM_DOMAIN, adapter_factory=adapter_factory)
+    cache = open_geocode_cache()
+    
+    # Resume: places that already have coordinates from a previous run are not looked up again
+    places = list(locations)
+    previous = load_previous_results(GEOCODED_PATH)
+    resumed = {
+        place: previous[place] for place in places
+        if place in previous and previous[place].get('chosen_lat') is not None
+    }
+    to_fetch = [place for place in places if place not in resumed]
+    print(f"Reusing {len(resumed)} locations geocoded in a previous run, fetching {len(to_fetch)}")
+    
+    # Nominatim is rate limited while Wikipedia is not, so both sources run concurrently
+    fetched_nom, wiki_coords = asyncio.run(fetch_all_coords(geolocator, to_fetch, cache))
+    cache.close()
+    nom_coords = dict(zip(to_fetch, fetched_nom))
+    for place, prev in resumed.items():
+        nom_coords[place] = (prev['nominatim_lat'], prev['nominatim_lon'])
+        wiki_coords[place] = (prev['wikipedia_lat'], prev['wikipedia_lon'], prev['wikipedia_page'])
     
     total = len(locations)
     results = {}
     
+    # Per-source results are kept in lists aligned with the order of `locations`
+    nom_results = [nom_coords[place] for place in places]
+    wiki_results = [wiki_coords[place] for place in places]
+    
+    # Compute all Nominatim/Wikipedia distances in one pass (NaN if a source is missing)
+    nom = np.array(nom_results, dtype=np.float64).reshape(-1, 2)
+    wiki = np.array([coords[:2] for coords in wiki_results], dtype=np.float64).reshape(-1, 2)
+    distances = haversine_km_vec(nom[:, 1], nom[:, 0], wiki[:, 1], wiki[:, 0])
+    
+    # Classify every location at once
+    has_nom = ~np.isnan(nom[:, 0])
+    has_wiki = ~np.isnan(wiki[:, 0])
+    has_both = has_nom & has_wiki
+    agree = has_both & (distances <= DIVERGENCE_THRESHOLD_KM)
+    
     # Statistics
     stats = {
-        'nominatim_success': 0,
-        'nominatim_failed': 0,
-        'wikipedia_success': 0,
-        'wikipedia_failed': 0,
-        'both_agree': 0,
-        'diverged_used_wikipedia': 0,
-        'only_nominatim': 0,
-        'only_wikipedia': 0,
-        'both_failed': 0,
+        'nominatim_success': int(np.count_nonzero(has_nom)),
+        'nominatim_failed': int(np.count_nonzero(~has_nom)),
+        'wikipedia_success': int(np.count_nonzero(has_wiki)),
+        'wikipedia_failed': int(np.count_nonzero(~has_wiki)),
+        'both_agree': int(np.count_nonzero(agree)),
+        'diverged_used_wikipedia': int(np.count_nonzero(has_both & ~agree)),
+        'only_nominatim': int(np.count_nonzero(has_nom & ~has_wiki)),
+        'only_wikipedia': int(np.count_nonzero(has_wiki & ~has_nom)),
+        'both_failed': int(np.count_nonzero(~has_nom & ~has_wiki)),
     }
     
     print(f"\n{'='*70}")
     print(f"{'#':<5} {'Status':<20} {'Nom':<8} {'Wiki':<8} {'Dist':<10} {'Location'}")
     print(f"{'='*70}")
     
-    for idx, (place, data) in enumerate(locations.items(), 1):
-        # Get Nominatim coordinates
-        nom_lat, nom_lon = get_nominatim_coords(geolocator, place)
-        time.sleep(1.1)  # Rate limit
-        
-        # Get Wikipedia coordinates
-        wiki_lat, wiki_lon, wiki_page = get_wikipedia_coords(session, place)
-        time.sleep(0.2)  # Rate limit
+    for i, (place, data) in enumerate(locations.items()):
+        idx = i + 1
+        nom_lat, nom_lon = nom_results[i]
+        wiki_lat, wiki_lon, wiki_page = wiki_results[i]
         
         # Determine which coordinates to use
         result = {
@@ -149,57 +430,39 @@ def geocode_all_locations(locations):
             'distance_km': None,
         }
         
-        has_nom = nom_lat is not None
-        has_wiki = wiki_lat is not None
-        
-        # Update stats
-        if has_nom:
-            stats['nominatim_success'] += 1
-        else:
-            stats['nominatim_failed'] += 1
-        if has_wiki:
-            stats['wikipedia_success'] += 1
-        else:
-            stats['wikipedia_failed'] += 1
-        
         # Decide which source to use
-        if has_nom and has_wiki:
-            distance = haversine_km(nom_lon, nom_lat, wiki_lon, wiki_lat)
+        if has_both[i]:
+            distance = float(distances[i])
             result['distance_km'] = round(distance, 2)
             
-            if distance <= DIVERGENCE_THRESHOLD_KM:
+            if agree[i]:
                 # Both agree - use Nominatim (usually more precise)
                 result['chosen_source'] = 'nominatim'
                 result['chosen_lat'] = nom_lat
                 result['chosen_lon'] = nom_lon
-                stats['both_agree'] += 1
                 status = "BOTH OK"
             else:
                 # Diverged - prefer Wikipedia (more reliable for named places)
                 result['chosen_source'] = 'wikipedia'
                 result['chosen_lat'] = wiki_lat
                 result['chosen_lon'] = wiki_lon
-                stats['diverged_used_wikipedia'] += 1
                 status = f"DIVERGED ({distance:.0f}km)"
-        elif has_nom:
+        elif has_nom[i]:
             result['chosen_source'] = 'nominatim'
             result['chosen_lat'] = nom_lat
             result['chosen_lon'] = nom_lon
-            stats['only_nominatim'] += 1
             status = "NOM ONLY"
-        elif has_wiki:
+        elif has_wiki[i]:
             result['chosen_source'] = 'wikipedia'
             result['chosen_lat'] = wiki_lat
             result['chosen_lon'] = wiki_lon
-            stats['only_wikipedia'] += 1
             status = "WIKI ONLY"
         else:
-            stats['both_failed'] += 1
             status = "FAILED"
         
         # Print progress
-        nom_status = "OK" if has_nom else "--"
-        wiki_status = "OK" if has_wiki else "--"
+        nom_status = "OK" if has_nom[i] else "--"
+        wiki_status = "OK" if has_wiki[i] else "--"
         dist_str = f"{result['distance_km']:.1f}km" if result['distance_km'] else "--"
         place_short = place[:30] + ".." if len(place) > 32 else place
         print(f"{idx:<5} {status:<20} {nom_status:<8} {wiki_status:<8} {dist_str:<10} {place_short}")
@@ -239,67 +502,73 @@ def print_summary(stats, total):
 
 def extract_country(place):
     """Extract country from place string"""
-    if place:
-        parts = place.split(',')
-        return parts[-1].strip() if parts else None
-    return None
+    return place.rpartition(',')[2].strip() if place else None
 
 
 def export_geojson(geocoded, wines, output_file='../data/wines_map.geojson'):
     """Export data as GeoJSON for mapping"""
-    # Count wines per location
-    wine_counts = {}
-    wine_lists = {}
-    for wine in wines:
+    # Count wines per location, keeping only the top-rated ones for the popup
+    wine_counts = Counter()
+    top_wines = defaultdict(list)  # Min-heap of (rating, -position, wine) per place
+    for position, wine in enumerate(wines):
         place = wine.get('place', '')
         if place:
-            wine_counts[place] = wine_counts.get(place, 0) + 1
-            if place not in wine_lists:
-                wine_lists[place] = []
-            wine_lists[place].append(f"{wine.get('name', '')} ({wine.get('vineyard', '')})")
+            wine_counts[place] += 1
+            # Ties keep the wine listed first
+            entry = (parse_rating(wine.get('rating')), -position, wine)
+            if len(top_wines[place]) < POPUP_WINES:
+                heapq.heappush(top_wines[place], entry)
+            else:
+                heapq.heappushpop(top_wines[place], entry)
     
-    features = []
-    for place, data in geocoded.items():
-        if data['chosen_lat'] is None:
-            continue
-        
-        features.append({
-            "type": "Feature",
-            "geometry": {
-                "type": "Point",
-                "coordinates": [data['chosen_lon'], data['chosen_lat']]
-            },
-            "properties": {
-                "place": place,
-                "country": extract_country(place),
-                "wine_count": wine_counts.get(place, 0),
-                "wines": "; ".join(wine_lists.get(place, [])[:10]),  # Limit to 10 wines
-                "source": data['chosen_source'],
-                "nominatim_lat": data['nominatim_lat'],
-                "nominatim_lon": data['nominatim_lon'],
-                "wikipedia_lat": data['wikipedia_lat'],
-                "wikipedia_lon": data['wikipedia_lon'],
-                "distance_km": data['distance_km'],
+    # Stream features to disk one at a time instead of building the whole collection
+    feature_count = 0
+    with open(output_file, 'wb') as f:
+        f.write(b'{"type":"FeatureCollection","features":[\n')
+        for place, data in geocoded.items():
+            if data['chosen_lat'] is None:
+                continue
+            
+            feature = {
+                "type": "Feature",
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [data['chosen_lon'], data['chosen_lat']]
+                },
+                "properties": {
+                    "place": place,
+                    "country": extract_country(place),
+                    "wine_count": wine_counts.get(place, 0),
+                    "wines": "; ".join(
+                        f"{wine.get('name', '')} ({wine.get('vineyard', '')})"
+                        for *_, wine in sorted(top_wines.get(place, []), reverse=True)
+                    ),
+                    "source": data['chosen_source'],
+                    "nominatim_lat": data['nominatim_lat'],
+                    "nominatim_lon": data['nominatim_lon'],
+                    "wikipedia_lat": data['wikipedia_lat'],
+                    "wikipedia_lon": data['wikipedia_lon'],
+                    "distance_km": data['distance_km'],
+                }
             }
-        })
-    
-    geojson = {
-        "type": "FeatureCollection",
-        "features": features
-    }
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(geojson, f, indent=2, ensure_ascii=False)
+            if feature_count:
+                f.write(b',\n')
+            f.write(orjson.dumps(feature))
+            feature_count += 1
+        f.write(b'\n]}\n')
     
-    print(f"\nGeoJSON exported to {output_file} ({len(features)} locations)")
-    return len(features)
+    print(f"\nGeoJSON exported to {output_file} ({feature_count} locations)")
+    return feature_count
 
 
 def main():
     # Load data
     print("Loading wine data...")
-    data = load_wine_data('../data/vivino_wines_complete_details_final_no_duplicates.json')
-    wines = data['wines']
+    # Keep only the few fields needed instead of every scraped wine in full
+    wines = [
+        {field: wine[field] for field in WINE_FIELDS if field in wine}
+        for wine in iter_wines('../data/vivino_wines_complete_details_final_no_duplicates.json')
+    ]
     print(f"Loaded {len(wines)} wines")
     
     # Extract unique locations
@@ -313,9 +582,9 @@ def main():
     geocoded, stats = geocode_all_locations(locations)
     
     # Save geocoded results
-    with open('../data/geocoded_locations.json', 'w', encoding='utf-8') as f:
-        json.dump(geocoded, f, indent=2, ensure_ascii=False)
-    print(f"\nGeocoded data saved to ../data/geocoded_locations.json")
+    with open(GEOCODED_PATH, 'wb') as f:
+        f.write(orjson.dumps(geocoded, option=orjson.OPT_INDENT_2))
+    print(f"\nGeocoded data saved to {GEOCODED_PATH}")
     
     # Export GeoJSON for mapping
     print("\nExporting GeoJSON...")
@@ -329,7 +598,7 @@ def main():
     print(f"  Unique locations:       {len(locations)}")
     print(f"  Successfully geocoded:  {num_features}")
     print(f"  Output files:")
-    print(f"    - ../data/geocoded_locations.json")
+    print(f"    - {GEOCODED_PATH}")
     print(f"    - ../data/wines_map.geojson")
     print(f"{'='*70}")
 
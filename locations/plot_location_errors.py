@@ -3,50 +3,68 @@ Analyze and visualize geocoding quality from the combined Nominatim + Wikipedia
 Uses data generated by get_nominatim_locations.py
 """
 
-import json
-import math
 from pathlib import Path
 
+import ijson
 import matplotlib.pyplot as plt
+import numpy as np
 
 GEOCODED_PATH = Path("../data/geocoded_locations.json")
 OUTPUT_DIR = Path(__file__).parent
 
 
 def load_geocoded_data(path: Path):
-    """Load geocoded locations and categorize by status."""
-    data = json.loads(path.read_text(encoding="utf-8"))
+    """Load geocoded locations and categorize by status.
     
+    Locations are streamed one at a time and only the fields needed for
+    the statistics are kept, instead of holding the whole parsed file.
+    """
     # Categorize locations
     both_sources = []      # Have both Nominatim and Wikipedia (with distance)
     nominatim_only = []    # Only Nominatim worked
     wikipedia_only = []    # Only Wikipedia worked
     both_failed = []       # Neither worked
+    chosen_sources = {}    # Source used for each location
     
-    for place, info in data.items():
-        has_nom = info.get('nominatim_lat') is not None
-        has_wiki = info.get('wikipedia_lat') is not None
-        distance = info.get('distance_km')
-        
-        if has_nom and has_wiki:
-            both_sources.append((place, distance, info.get('chosen_source')))
-        elif has_nom:
-            nominatim_only.append(place)
-        elif has_wiki:
-            wikipedia_only.append(place)
-        else:
-            both_failed.append(place)
+    with path.open("rb") as f:
+        for place, info in ijson.kvitems(f, "", use_float=True):
+            has_nom = info.get('nominatim_lat') is not None
+            has_wiki = info.get('wikipedia_lat') is not None
+            distance = info.get('distance_km')
+            chosen_sources[place] = info.get('chosen_source')
+            
+            if has_nom and has_wiki:
+                both_sources.append((place, distance, info.get('chosen_source')))
+            elif has_nom:
+                nominatim_only.append(place)
+            elif has_wiki:
+                wikipedia_only.append(place)
+            else:
+                both_failed.append(place)
     
     return {
         'both_sources': both_sources,
         'nominatim_only': nominatim_only,
         'wikipedia_only': wikipedia_only,
         'both_failed': both_failed,
-        'total': len(data),
-        'raw_data': data,
+        'total': len(chosen_sources),
+        'chosen_sources': chosen_sources,
     }
 
 
+def top_k_indices(values, k):
+    """Return indices of the k largest values, largest first (ties keep input order)."""
+    k = min(k, values.size)
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    # O(N) selection of the k-th largest value, then the earliest ties at that value
+    threshold = -np.partition(-values, k - 1)[k - 1]
+    above = np.flatnonzero(values > threshold)
+    ties = np.flatnonzero(values == threshold)[:k - above.size]
+    idx = np.concatenate((above, ties))
+    return idx[np.argsort(-values[idx], kind='stable')]
+
+
 # Load data
 if not GEOCODED_PATH.exists():
     raise SystemExit(f"File not found: {GEOCODED_PATH}\nRun locations/get_locations.py first.")
@@ -55,13 +73,16 @@ data = load_geocoded_data(GEOCODED_PATH)
 
 # Extract distances for locations that have both sources
 distances_with_labels = [(place, dist) for place, dist, _ in data['both_sources'] if dist is not None]
+dists = np.array([dist for _, dist in distances_with_labels], dtype=np.float64)
+
+# Largest divergences, shared by the outliers chart and the top 10 table
+top_idx = top_k_indices(dists, 15)
+top = [distances_with_labels[i] for i in top_idx]
 
 if not distances_with_labels:
     print("No locations with both Nominatim and Wikipedia coordinates found.")
     print("Charts will not be generated, but statistics will be shown.")
 else:
-    labels, dists = zip(*distances_with_labels)
-    
     # 1) Histogram (km)
     plt.figure(figsize=(10, 6))
     plt.hist(dists, bins=30, edgecolor='black', alpha=0.7)
@@ -74,8 +95,8 @@ else:
     print(f"Saved: {OUTPUT_DIR / 'distance_histogram.png'}")
 
     # 2) Histogram (log10 km)
-    logd = [math.log10(d) for d in dists if d > 0]
-    if logd:
+    logd = np.log10(dists[dists > 0])
+    if logd.size:
         plt.figure(figsize=(10, 6))
         plt.hist(logd, bins=30, edgecolor='black', alpha=0.7)
         plt.xlabel("log10(distance in km)")
@@ -87,7 +108,6 @@ else:
         print(f"Saved: {OUTPUT_DIR / 'distance_histogram_log.png'}")
 
     # 3) Top 15 outliers bar chart
-    top = sorted(distances_with_labels, key=lambda x: x[1], reverse=True)[:15]
     top_labels = [t[0][:30] + ".." if len(t[0]) > 32 else t[0] for t in top][::-1]
     top_dists = [t[1] for t in top][::-1]
 
@@ -144,27 +164,27 @@ if distances_with_labels:
     print("DISTANCE ANALYSIS (Nominatim vs Wikipedia)")
     print("=" * 70)
     
-    dists_list = [d for _, d in distances_with_labels]
     thresholds = [1, 5, 10, 25, 50, 100, 500, 1000]
+    sorted_dists = np.sort(dists)
+    counts = np.searchsorted(sorted_dists, thresholds, side='right')
     
     print(f"\n{'Threshold':<15} {'Count':<10} {'Percentage':<15} {'Cumulative'}")
     print("-" * 55)
     
-    for threshold in thresholds:
-        count = sum(1 for d in dists_list if d <= threshold)
-        pct = count / len(dists_list) * 100
+    for threshold, count in zip(thresholds, counts):
+        pct = count / dists.size * 100
         print(f"≤ {threshold:>6} km     {count:<10} {pct:>6.1f}%          {pct:>6.1f}%")
     
-    above_max = sum(1 for d in dists_list if d > thresholds[-1])
+    above_max = dists.size - counts[-1]
     if above_max > 0:
-        print(f"> {thresholds[-1]:>6} km     {above_max:<10} {above_max/len(dists_list)*100:>6.1f}%")
+        print(f"> {thresholds[-1]:>6} km     {above_max:<10} {above_max/dists.size*100:>6.1f}%")
     
     print(f"\nStatistics:")
-    print(f"  Locations compared: {len(dists_list)}")
-    print(f"  Mean distance:      {sum(dists_list)/len(dists_list):.1f} km")
-    print(f"  Median distance:    {sorted(dists_list)[len(dists_list)//2]:.1f} km")
-    print(f"  Max distance:       {max(dists_list):.1f} km")
-    print(f"  Min distance:       {min(dists_list):.2f} km")
+    print(f"  Locations compared: {dists.size}")
+    print(f"  Mean distance:      {dists.mean():.1f} km")
+    print(f"  Median distance:    {np.median(sorted_dists):.1f} km")
+    print(f"  Max distance:       {sorted_dists[-1]:.1f} km")
+    print(f"  Min distance:       {sorted_dists[0]:.2f} km")
 
 # ============================================================
 # TOP 10 LARGEST DIVERGENCES
@@ -174,15 +194,14 @@ if distances_with_labels:
     print("TOP 10 LARGEST DIVERGENCES")
     print("=" * 70)
     
-    top10 = sorted(distances_with_labels, key=lambda x: x[1], reverse=True)[:10]
+    top10 = top[:10]
     
     print(f"\n{'Rank':<6} {'Location':<40} {'Distance':<12} {'Used'}")
     print("-" * 70)
     
     for i, (place, dist) in enumerate(top10, 1):
         # Find which source was used
-        info = data['raw_data'].get(place, {})
-        source = info.get('chosen_source', '?')
+        source = data['chosen_sources'].get(place, '?')
         place_short = place[:38] + ".." if len(place) > 40 else place
         print(f"{i:<6} {place_short:<40} {dist:>8.1f} km   {source}")
 
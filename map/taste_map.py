@@ -3,8 +3,12 @@ Wine taste geography map (Europe)
 Single HTML with switchable taste layers (only one active at a time)
 """
 import json
+import os
 import folium
 import branca.colormap as cm
+import ijson
+import numpy as np
+import pandas as pd
 
 # ----------------------------
 # Files
@@ -12,12 +16,14 @@ import branca.colormap as cm
 WINES_FILE = "../data/vivino_wines_complete_details_final_no_duplicates.json"
 LOCATIONS_FILE = "../data/geocoded_locations.json"
 OUTPUT_FILE = "wine_taste_map.html"
+ENRICHED_CACHE_FILE = "../data/.taste_map_cache.pkl"  # Wines flattened and joined with coordinates
 
 # ----------------------------
 # Map config
 # ----------------------------
 EUROPE_CENTER = [45, 5]
 ZOOM_START = 5
+COLOR_STEPS = 256  # Colors precomputed per colormap (values are rounded to the nearest one)
 TASTE_DIMENSIONS = {
     "light_bold": {
         "label": "Light → Bold",
@@ -37,29 +43,66 @@ TASTE_DIMENSIONS = {
     },
 }
 
-# ----------------------------
-# Load data
-# ----------------------------
-with open(WINES_FILE, encoding="utf-8") as f:
-    wines = json.load(f)["wines"]
-with open(LOCATIONS_FILE, encoding="utf-8") as f:
-    locations = json.load(f)
+# Colors each wine for the active taste and builds its popup when opened
+# (styleWine and winePopup are defined in taste_switch_js below)
+TASTE_ON_EACH_FEATURE = folium.JsCode("""
+function (feature, layer) {
+    styleWine(layer, activeTaste);
+    layer.bindPopup(function () { return winePopup(feature); });
+}
+""")
 
 # ----------------------------
-# Join wines with coordinates
+# Load data and join wines with coordinates
 # ----------------------------
-enriched = []
-for w in wines:
-    loc = locations.get(w.get("place"))
-    if not loc:
-        continue
-    lat = loc.get("chosen_lat")
-    lon = loc.get("chosen_lon")
-    if lat is None or lon is None:
-        continue
-    w["lat"] = lat
-    w["lon"] = lon
-    enriched.append(w)
+def build_enriched():
+    """Join wines with their coordinates, one column per taste dimension."""
+    # Stream the wines and keep only the fields the map uses
+    with open(WINES_FILE, "rb") as f:
+        wines = [
+            (wine.get("name"), wine.get("place"), wine.get("taste_characteristics"))
+            for wine in ijson.items(f, "wines.item", use_float=True)
+        ]
+    with open(LOCATIONS_FILE, encoding="utf-8") as f:
+        locations = json.load(f)
+    
+    wines_df = pd.DataFrame(wines, columns=["name", "place", "taste_characteristics"])
+    locations_df = (
+        pd.DataFrame.from_dict(locations, orient="index", columns=["chosen_lat", "chosen_lon"])
+        .rename(columns={"chosen_lat": "lat", "chosen_lon": "lon"})
+    )
+    # Inner join keeps the wines' order and drops places that were never geocoded
+    enriched = wines_df.merge(locations_df, left_on="place", right_index=True, how="inner")
+    enriched = enriched.dropna(subset=["lat", "lon"])
+    
+    # One column per taste dimension (NaN when Vivino has no value for that wine)
+    for taste in TASTE_DIMENSIONS:
+        enriched[taste] = enriched["taste_characteristics"].map(
+            lambda tc, taste=taste: (tc.get(taste) or {}).get("percentage")
+        ) / 0.85
+    return enriched.drop(columns="taste_characteristics")
+
+
+# Reuse the flattened table unless one of the input files or this script (the taste dimensions
+# and the merge) changed since it was written
+sources_mtime = max(os.path.getmtime(path) for path in (WINES_FILE, LOCATIONS_FILE, __file__))
+enriched = None
+if os.path.exists(ENRICHED_CACHE_FILE) and os.path.getmtime(ENRICHED_CACHE_FILE) > sources_mtime:
+    try:
+        enriched = pd.read_pickle(ENRICHED_CACHE_FILE)
+    except Exception as e:
+        # e.g. written by another pandas version, or truncated
+        print(f"Ignoring unreadable cache {ENRICHED_CACHE_FILE}: {e}")
+if enriched is None:
+    enriched = build_enriched()
+    enriched.to_pickle(ENRICHED_CACHE_FILE)
+
+# Plain arrays for the marker loops, one value array per taste dimension
+names = enriched["name"].to_numpy()
+places = enriched["place"].to_numpy()
+lats = enriched["lat"].to_numpy(dtype=float)
+lons = enriched["lon"].to_numpy(dtype=float)
+taste_values = {taste: enriched[taste].to_numpy(dtype=float) for taste in TASTE_DIMENSIONS}
 
 # ----------------------------
 # Base map
@@ -77,10 +120,9 @@ m = folium.Map(
 colormaps = {}
 colormap_ids = {}
 layer_names = []
+color_luts = {}
 
 for idx, (taste, cfg) in enumerate(TASTE_DIMENSIONS.items()):
-    # Only show the first layer by default, keep as overlay
-    layer = folium.FeatureGroup(name=cfg["label"], show=(idx == 0))
     layer_names.append(cfg["label"])
     
     colormap = cm.LinearColormap(
@@ -90,26 +132,38 @@ for idx, (taste, cfg) in enumerate(TASTE_DIMENSIONS.items()):
         caption=cfg["label"],
     )
     colormaps[taste] = colormap
+    # Sample the colormap once, markers then just index into the table in the browser
+    color_luts[taste] = [colormap(i * 100 / (COLOR_STEPS - 1)) for i in range(COLOR_STEPS)]
     
-    for w in enriched:
-        tc = w["taste_characteristics"].get(taste)
-        if not tc:
-            continue
-        value = tc["percentage"]/0.85
-        folium.CircleMarker(
-            location=[w["lat"], w["lon"]],
-            radius=6,
-            color=colormap(value),
-            fill=True,
-            fill_opacity=0.75,
-            popup=(
-                f"<b>{w['name']}</b><br>"
-                f"{w['place']}<br>"
-                f"{cfg['label']}: {value:.1f}%"
-            ),
-        ).add_to(layer)
-    
-    layer.add_to(m)
+    # Empty overlay standing for this taste in the layer control, the markers live in one shared layer
+    folium.FeatureGroup(name=cfg["label"], show=(idx == 0)).add_to(m)
+
+# One GeoJSON point per wine with a value for at least one taste, carrying all of its values
+values = np.column_stack([taste_values[taste] for taste in TASTE_DIMENSIONS])
+features = [
+    {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [float(lons[i]), float(lats[i])]},
+        "properties": {
+            "name": names[i],
+            "place": places[i],
+            **{
+                taste: None if np.isnan(value) else float(value)
+                for taste, value in zip(TASTE_DIMENSIONS, values[i])
+            },
+        },
+    }
+    for i in np.flatnonzero(~np.isnan(values).all(axis=1)).tolist()
+]
+
+# Colored for the active taste in the browser, see taste_switch_js below
+wines_layer = folium.GeoJson(
+    {"type": "FeatureCollection", "features": features},
+    name="Wines",
+    control=False,
+    marker=folium.CircleMarker(radius=6, fill=True, fill_opacity=0.75),
+    on_each_feature=TASTE_ON_EACH_FEATURE,
+).add_to(m)
 
 # ----------------------------
 # Custom layer control (overlays only, no base layers)
@@ -180,6 +234,69 @@ colormap_container += "</div>"
 
 m.get_root().html.add_child(folium.Element(colormap_container))
 
+# ----------------------------
+# Recolor the shared wine layer when another taste is checked
+# ----------------------------
+taste_switch_js = f"""
+<script>
+var tasteLabels = {json.dumps({taste: cfg["label"] for taste, cfg in TASTE_DIMENSIONS.items()})};
+var tasteColors = {json.dumps(color_luts)};
+var activeTaste = {json.dumps(next(iter(TASTE_DIMENSIONS)))};
+var wineMarkers = null;
+
+function styleWine(marker, taste) {{
+    var value = marker.feature.properties[taste];
+    var color = tasteColors[taste][Math.min({COLOR_STEPS - 1}, Math.round(value * {COLOR_STEPS - 1} / 100))];
+    marker.setStyle({{color: color, fillColor: color}});
+}}
+
+function winePopup(feature) {{
+    var props = feature.properties;
+    return '<b>' + props.name + '</b><br>' + props.place + '<br>'
+        + tasteLabels[activeTaste] + ': ' + props[activeTaste].toFixed(1) + '%';
+}}
+
+// Only wines with a value for the taste stay on the map
+function showTaste(taste) {{
+    var map = {m.get_name()};
+    var layer = {wines_layer.get_name()};
+    wineMarkers = wineMarkers || layer.getLayers();
+    activeTaste = taste;
+    wineMarkers.forEach(function(marker) {{
+        if (marker.feature.properties[taste] === null) {{
+            layer.removeLayer(marker);
+        }} else {{
+            styleWine(marker, taste);
+            layer.addLayer(marker);
+        }}
+    }});
+    if (!map.hasLayer(layer)) layer.addTo(map);
+}}
+
+function hideTastes() {{
+    activeTaste = null;
+    {wines_layer.get_name()}.remove();
+}}
+
+document.addEventListener('DOMContentLoaded', function() {{
+    showTaste(activeTaste);
+    
+    var labelTastes = {{}};
+    Object.keys(tasteLabels).forEach(function(taste) {{
+        labelTastes[tasteLabels[taste]] = taste;
+    }});
+    {m.get_name()}.on('overlayadd', function(e) {{
+        if (e.name in labelTastes) showTaste(labelTastes[e.name]);
+    }});
+    {m.get_name()}.on('overlayremove', function(e) {{
+        if (labelTastes[e.name] === activeTaste) hideTastes();
+    }});
+}});
+</script>
+"""
+
+m.get_root().html.add_child(folium.Element(taste_switch_js))
+
 # ----------------------------
 # Add custom JavaScript to make layers mutually exclusive and toggle colormaps
 # ----------------------------
@@ -1,6 +1,6 @@
 """Minimal wine map viewer with Folium."""
 import folium
-from folium.plugins import MarkerCluster
+from folium.plugins import FastMarkerCluster
 import json
 import webbrowser
 
@@ -11,38 +11,56 @@ COLORS = {
     'Allemagne': 'gray', 'Australie': 'beige', 'Afrique du Sud': 'black',
 }
 
+# Popup shown for each place
+POPUP_TEMPLATE = """
+    <div style="width:250px">
+        <h4 style="margin:0;color:#722F37">🍷 {place}</h4>
+        <p><b>{wine_count}</b> wines from <b>{country}</b></p>
+        <hr style="margin:5px 0">
+        <small>{wine_list}</small>
+    </div>
+    """
+
+# Builds each marker in the browser from a [lat, lon, color, popup_html] row,
+# sharing one icon per color instead of creating one per marker
+MARKER_CALLBACK = """
+(function () {
+    var icons = {};
+    return function (row) {
+        var icon = icons[row[2]] || (icons[row[2]] = L.AwesomeMarkers.icon({icon: 'glass', prefix: 'fa', markerColor: row[2]}));
+        var marker = L.marker(new L.LatLng(row[0], row[1]), {icon: icon});
+        marker.bindPopup(row[3], {maxWidth: 300});
+        return marker;
+    };
+})()
+"""
+
+
+def build_point(feature):
+    """Turn a GeoJSON feature into a [lat, lon, color, popup_html] row"""
+    lon, lat = feature['geometry']['coordinates']
+    props = feature['properties']
+    country = props.get('country', '')
+    wines = props.get('wines', '').split('; ')[:5]  # Show max 5 wines
+    popup_html = POPUP_TEMPLATE.format(
+        place=props['place'],
+        wine_count=props['wine_count'],
+        country=country,
+        wine_list='<br>'.join(f"• {w}" for w in wines if w),
+    )
+    return [lat, lon, COLORS.get(country, 'gray'), popup_html]
+
+
 # Load GeoJSON
 with open('../data/wines_map.geojson') as f:
     data = json.load(f)
 
 # Create map
 m = folium.Map(location=[46, 2], zoom_start=4, tiles='CartoDB positron')
-cluster = MarkerCluster().add_to(m)
 
-# Add markers
-for feature in data['features']:
-    coords = feature['geometry']['coordinates']
-    props = feature['properties']
-    country = props.get('country', '')
-    color = COLORS.get(country, 'gray')
-    
-    # Build popup with wine list
-    wines = props.get('wines', '').split('; ')[:5]  # Show max 5 wines
-    wine_list = '<br>'.join(f"• {w}" for w in wines if w)
-    popup_html = f"""
-    <div style="width:250px">
-        <h4 style="margin:0;color:#722F37">🍷 {props['place']}</h4>
-        <p><b>{props['wine_count']}</b> wines from <b>{country}</b></p>
-        <hr style="margin:5px 0">
-        <small>{wine_list}</small>
-    </div>
-    """
-    
-    folium.Marker(
-        location=[coords[1], coords[0]],
-        popup=folium.Popup(popup_html, max_width=300),
-        icon=folium.Icon(color=color, icon='glass', prefix='fa'),
-    ).add_to(cluster)
+# Markers are built client-side from a plain data array instead of one Python Marker each
+points = list(map(build_point, data['features']))
+FastMarkerCluster(data=points, callback=MARKER_CALLBACK).add_to(m)
 
 # Save and open
 m.save('wines_map.html')
@@ -3,27 +3,28 @@ Check for duplicate wines in vivino JSON data and optionally filter them out.
 Duplicates are identified by (vineyard, name, place) combination.
 """
 
-import json
-from collections import Counter
+import orjson
 
 def check_duplicates(filepath="../data/vivino_wines_complete_details_final.json", remove_duplicates=True):
-    with open(filepath, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    with open(filepath, "rb") as f:
+        data = orjson.loads(f.read())
     
     wines = data.get("wines", data) if isinstance(data, dict) else data
     
-    # Create keys from (vineyard, name, place)
-    keys = [
-        (w.get("vineyard"), w.get("name"), w.get("place"))
-        for w in wines
-    ]
+    # Count each (vineyard, name, place) key and keep its first wine in a single pass
+    seen = {}
+    for wine in wines:
+        key = (wine.get("vineyard"), wine.get("name"), wine.get("place"))
+        if key in seen:
+            seen[key][0] += 1
+        else:
+            seen[key] = [1, wine]
     
     # Find duplicates
-    counts = Counter(keys)
-    duplicates = {k: v for k, v in counts.items() if v > 1}
+    duplicates = {key: count for key, (count, _) in seen.items() if count > 1}
     
     print(f"Total wines: {len(wines)}")
-    print(f"Unique wines: {len(counts)}")
+    print(f"Unique wines: {len(seen)}")
     print(f"Duplicate entries: {len(duplicates)}")
     
     if duplicates:
@@ -35,21 +36,15 @@ def check_duplicates(filepath="../data/vivino_wines_complete_details_final.json"
     
     # Remove duplicates and save to new file
     if remove_duplicates:
-        seen = set()
-        unique_wines = []
-        for wine in wines:
-            key = (wine.get("vineyard"), wine.get("name"), wine.get("place"))
-            if key not in seen:
-                seen.add(key)
-                unique_wines.append(wine)
+        unique_wines = [wine for _, wine in seen.values()]
         
         # Create output filename
         output_path = filepath.replace(".json", "_no_duplicates.json")
         
         # Save with same structure as original
         output_data = {"total_wines": len(unique_wines), "wines": unique_wines}
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        with open(output_path, "wb") as f:
+            f.write(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
         
         print(f"\nSaved {len(unique_wines)} unique wines to: {output_path}")
     
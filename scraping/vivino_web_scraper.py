@@ -4,20 +4,194 @@ Extracts wine names, vineyards, and places from Vivino explore pages.
 """
 
 import argparse
-import json
+import asyncio
+import os
+import queue
 import re
+import sqlite3
+import threading
 import time
-import undetected_chromedriver as uc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+import httpx
+import lxml.html
+from lxml.cssselect import CSSSelector
+import orjson
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException
 
 # Countries to include when filtering wines
 ALLOWED_COUNTRIES = ["france", "italy", "spain", "italia", "espagne", "italie", "españa", "francia"]
 
-# Track if cookies have been dismissed (only need to do once per session)
-_cookies_dismissed = False
+# Default explore search: the same filters as the site's compressed e= link (red and white
+# wines rated 3.8+, 7-60 EUR, best picks first), restricted to France, Italy and Spain
+# so pages of other countries are never fetched
+DEFAULT_URL = "https://www.vivino.com/fr/explore?" + urlencode([
+    ("country_codes[]", "fr"), ("country_codes[]", "it"), ("country_codes[]", "es"),
+    ("wine_type_ids[]", "1"), ("wine_type_ids[]", "2"),
+    ("min_rating", "3.8"), ("price_range_min", "7"), ("price_range_max", "60"),
+    ("currency_code", "EUR"), ("order_by", "best_picks"), ("order", "desc"),
+])
+
+# Map French fact labels to English keys (other labels become snake_case)
+FACT_LABEL_KEYS = {
+    "Domaine viticole": "winery",
+    "Cépages": "grapes",
+    "Région": "region",
+    "Style de vin": "wine_style",
+    "Allergènes": "allergens",
+    "Description du vin": "description",
+}
+
+# Keys for the (left, right) labels of each taste bar
+TASTE_LABEL_KEYS = {
+    ("Léger", "Puissant"): "light_bold",
+    ("Souple", "Tannique"): "smooth_tannic",
+    ("Sec", "Moelleux"): "dry_sweet",
+    ("Doux", "Acide"): "soft_acidic",
+    # English versions
+    ("Light", "Bold"): "light_bold",
+    ("Smooth", "Tannic"): "smooth_tannic",
+    ("Dry", "Sweet"): "dry_sweet",
+    ("Soft", "Acidic"): "soft_acidic",
+}
+
+# Position of a taste bar's marker, from its style (e.g., "left: 72.7135%;")
+LEFT_PERCENT_RE = re.compile(r'left:\s*([\d.]+)%')
+
+# Laying out page text like a browser: tags whose content is never shown, tags that start a new line
+INVISIBLE_TAGS = frozenset(["script", "style", "noscript", "template", "head"])
+BLOCK_TAGS = frozenset([
+    "address", "article", "aside", "blockquote", "caption", "dd", "details", "dialog", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header",
+    "hr", "li", "main", "nav", "ol", "p", "pre", "section", "summary", "table", "tbody", "tfoot",
+    "thead", "tr", "ul",
+])
+HIDDEN_STYLE_RE = re.compile(r'display\s*:\s*none|visibility\s*:\s*hidden')
+INLINE_SPACE_RE = re.compile(r'[^\S\n]+')  # Whitespace runs other than newlines
+
+# Requests blocked in the browser: images, fonts, media and trackers (stylesheets are kept,
+# the taste bars' positions are inline styles but the cards rely on CSS for layout)
+BLOCKED_URLS = [
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.svg",
+    "*.woff", "*.woff2", "*.ttf",
+    "*.mp4", "*.webm",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*facebook.net*",
+    "*segment.io*", "*segment.com*",
+]
+
+# Parallel scraping: listing pages, then detail pages, with the same browsers
+BROWSER_WORKERS = 4  # Chrome drivers scraping at once (each is a full browser)
+WORKER_STAGGER_SECONDS = 0.1  # Offset between the workers' first requests
+DRIVER_RECYCLE_PAGES = 50  # Listing pages scraped with one browser before it is restarted
+
+# Static detail-page fetching (pages that fail fall back to Selenium)
+STATIC_CONCURRENCY = 16  # Detail pages requested at once over HTTP
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Language": "fr-FR,fr;q=0.9",  # Labels are mapped from the French site
+}
+
+# Detail page selectors, translated to XPath once instead of on every lookup
+DETAIL_SELECTORS = {
+    name: CSSSelector(css, translator="html")
+    for name, css in {
+        "facts_table": ".wineFacts__wineFacts--2Ih8B",
+        "fact_row": "[data-testid='wineFactRow']",
+        "fact_label": ".wineFacts__headerLabel--14doB",
+        "fact_value": ".wineFacts__fact--3BAsi",
+        "taste_row": ".tasteStructure__tasteCharacteristic--jLtsE",
+        "taste_property": ".tasteStructure__property--CLNl_",
+        "taste_progress": ".indicatorBar__progress--3aXLX",
+        "food": ".foodPairing__imageContainer--2CtYR",
+        "food_name": "div:not([role='img'])",
+        "food_image": "[role='img']",
+    }.items()
+}
+
+# Chrome switches that keep each browser small when several run at once
+LOW_MEMORY_ARGS = [
+    "--disable-extensions",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,InterestCohort,BackForwardCache",
+    "--disable-component-update",
+    "--metrics-recording-only",
+    "--memory-pressure-off",
+]
+
+# Listing results are appended here page by page, so a crashed run keeps what it scraped
+PARTIAL_OUTPUT_FILE = "../data/vivino_wines.jsonl"
+CHECKPOINT_FILE = "../data/vivino_wines.checkpoint.json"  # Last listing page written to the partial file
+OUTPUT_FILE = "../data/vivino_wines.json"
+
+# Explore results as JSON, the same data the explore page's cards are rendered from
+EXPLORE_API_URL = "https://www.vivino.com/api/explore/explore"
+LISTING_CONCURRENCY = 8  # Explore API pages requested at once
+LISTING_PAGE_SIZE = 25  # Wines per explore API page, unless the start URL sets per_page
+WINE_PAGE_URL = "https://www.vivino.com/fr/{seo_name}/w/{wine_id}"
+
+# Detail pages are cached on disk so re-runs don't fetch them again
+PAGE_CACHE_PATH = "../data/page_cache.sqlite"
+PAGE_CACHE_TTL_SECONDS = 7 * 24 * 3600  # Re-fetch cached pages older than this
+PAGE_CACHE_QUERY_CHUNK = 500  # URLs looked up per query (older SQLite builds allow 999 parameters)
+
+# Wine card selectors, read from the page HTML in one go like the detail pages
+CARD_SELECTOR = CSSSelector("[data-testid='wineCard']", translator="html")
+CARD_LINK_SELECTOR = CSSSelector("a[data-testid='vintagePageLink']", translator="html")
+CARD_FIELD_SELECTORS = {
+    field: CSSSelector(css, translator="html")
+    for field, css in {
+        "vineyard": ".wineInfoVintage__truncate--3QAtw",
+        "name": ".wineInfoVintage__vintage--VvWlU",
+        "place": ".wineInfoLocation__regionAndCountry--1nEJz",
+        "rating": ".vivinoRating__averageValue--3p6Wp",
+        "price": ".addToCartButton__price--qJdh4",
+    }.items()
+}
+
+# Cookie consent buttons, in order of preference (Accept is better - sets proper cookies)
+CONSENT_SELECTORS = [
+    "#onetrust-accept-btn-handler",  # OneTrust Accept All
+    "#onetrust-reject-all-handler",  # OneTrust Reject All
+    "button[title='Accept All']",
+    "button[title='Reject All']",
+    ".onetrust-close-btn-handler",
+    "#accept-cookies",
+    "[data-testid='acceptCookies']",
+]
+
+# Clicks the first consent button present; without one, removes the consent overlay if any
+CONSENT_JS = """
+for (const selector of arguments[0]) {
+    const button = document.querySelector(selector);
+    if (button) {
+        button.click();
+        return {clicked: selector, removed: false};
+    }
+}
+let removed = false;
+for (const id of ["consent-blocker", "onetrust-consent-sdk"]) {
+    const overlay = document.getElementById(id);
+    if (overlay) {
+        overlay.remove();
+        removed = true;
+    }
+}
+return {clicked: null, removed: removed};
+"""
+
+# OneTrust cookies of an "accept all" choice, set in each new browser so the banner isn't shown
+# (CONSENT_JS still runs on the first page in case OneTrust doesn't accept them)
+CONSENT_COOKIE = {"domain": ".vivino.com", "path": "/", "secure": True}
+CONSENT_GROUPS = "groups=C0001:1,C0002:1,C0003:1,C0004:1&interactionCount=1&isGpcEnabled=0"
+
+# The chromedriver binary is patched by the first browser started, the others wait for it
+_chromedriver_lock = threading.Lock()
+_chromedriver_patched = False
 
 
 def is_wine_from_allowed_country(wine):
@@ -30,15 +204,59 @@ def is_wine_from_allowed_country(wine):
     return any(country in place_lower for country in ALLOWED_COUNTRIES)
 
 
-def create_driver():
+def patch_chromedriver(uc):
+    """Download and patch undetected-chromedriver's chromedriver binary, once per run."""
+    global _chromedriver_patched
+    
+    # Every uc.Chrome() rewrites the same binary by default, which races when browsers start in parallel
+    with _chromedriver_lock:
+        if not _chromedriver_patched:
+            uc.Patcher().auto()
+            _chromedriver_patched = True
+
+
+def create_driver(headless=False):
     """Create an undetected Chrome driver to bypass bot detection."""
+    # Imported here: runs served by the explore API and static fetches never start Chrome
+    import undetected_chromedriver as uc
+    
+    patch_chromedriver(uc)
+    
     options = uc.ChromeOptions()
-    # NOTE: No headless mode - undetected-chromedriver works better with visible browser
+    # NOTE: Visible by default - undetected-chromedriver works better with visible browser,
+    # headless (Chrome's new headless mode) saves memory when running many workers
+    if headless:
+        options.add_argument("--disable-gpu")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--window-size=1920,1080")
+    # No update checks, safe browsing lookups or other background requests between page loads
+    options.add_argument("--disable-background-networking")
+    # Windows hidden behind the other workers' windows keep rendering at full speed
+    options.add_argument("--disable-renderer-backgrounding")
+    options.add_argument("--disable-backgrounding-occluded-windows")
+    for argument in LOW_MEMORY_ARGS:
+        options.add_argument(argument)
+    # Return from driver.get() once the DOM is ready, explicit waits cover the elements we need
+    options.page_load_strategy = "eager"
+    
+    # Never load images (bottle shots, food thumbnails) or ask for notifications, nothing we scrape depends on them
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+    
+    # Reuse the already patched binary instead of patching it again
+    driver = uc.Chrome(options=options, use_subprocess=True, headless=headless, user_multi_procs=True)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
     
-    driver = uc.Chrome(options=options, use_subprocess=True)
+    # Answer the cookie consent up front instead of clicking the banner on the first page
+    closed_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    driver.execute_cdp_cmd("Network.setCookies", {"cookies": [
+        {**CONSENT_COOKIE, "name": "OptanonAlertBoxClosed", "value": closed_at},
+        {**CONSENT_COOKIE, "name": "OptanonConsent", "value": CONSENT_GROUPS},
+    ]})
     return driver
 
 
@@ -59,65 +277,333 @@ def parse_wine_cards(driver):
 
         return wines
     
-    cards = driver.find_elements(By.CSS_SELECTOR, "[data-testid='wineCard']")
+    # One round-trip for the whole page, the cards are then read offline
+    return extract_wine_cards(driver.page_source, driver.current_url)
+
+
+def is_hidden(element):
+    """Check if an element is left out of the page's text (scripts, styles, hidden attribute or inline style)."""
+    return (element.tag in INVISIBLE_TAGS or element.get("hidden") is not None
+            or HIDDEN_STYLE_RE.search(element.get("style", "")) is not None)
+
+
+def element_text(element):
+    """Return an element's visible text, laid out close to what Selenium's .text gives.
+    
+    Blocks and <br> start new lines, newlines inside the text are kept (Vivino shows
+    descriptions with their own line breaks) and other whitespace runs become one space.
+    Elements hidden by a stylesheet rather than inline can't be told apart from static HTML.
+    """
+    lines = [""]
+    
+    def walk(node):
+        block = node.tag in BLOCK_TAGS
+        if block and lines[-1].strip():
+            lines.append("")
+        elif node.tag in ("td", "th") and lines[-1].strip() and not lines[-1][-1].isspace():
+            lines[-1] += " "  # Cells of a row stay on one line
+        lines[-1] += node.text or ""
+        for child in node:
+            # Comments and processing instructions have no string tag, only their tail is text
+            if isinstance(child.tag, str) and not is_hidden(child):
+                if child.tag == "br":
+                    lines.append("")
+                else:
+                    walk(child)
+            lines[-1] += child.tail or ""
+        if block and lines[-1].strip():
+            lines.append("")
     
-    for card in cards:
+    walk(element)
+    return "\n".join(INLINE_SPACE_RE.sub(" ", line.strip()) for line in lines).strip()
+
+
+def extract_wine_cards(html, base_url):
+    """Read the fields of every wine card from an explore page's HTML."""
+    wines = []
+    for card in CARD_SELECTOR(lxml.html.fromstring(html)):
         wine = {}
+        for field, selector in CARD_FIELD_SELECTORS.items():
+            elems = selector(card)
+            # Card fields are single values (vineyard, name and place are the duplicate filter's key),
+            # so a layout line break, e.g. before the vintage, becomes a space
+            wine[field] = element_text(elems[0]).replace("\n", " ") if elems else None
         
-        # Extract vineyard/winery name (first truncate element)
-        try:
-            vineyard_elem = card.find_element(By.CSS_SELECTOR, ".wineInfoVintage__truncate--3QAtw")
-            wine["vineyard"] = vineyard_elem.text.strip()
-        except NoSuchElementException:
-            wine["vineyard"] = None
-        
-        # Extract wine name with vintage
-        try:
-            name_elem = card.find_element(By.CSS_SELECTOR, ".wineInfoVintage__vintage--VvWlU")
-            wine["name"] = name_elem.text.strip()
-        except NoSuchElementException:
-            wine["name"] = None
-        
-        # Extract region and country
-        try:
-            location_elem = card.find_element(By.CSS_SELECTOR, ".wineInfoLocation__regionAndCountry--1nEJz")
-            wine["place"] = location_elem.text.strip()
-        except NoSuchElementException:
-            wine["place"] = None
+        link = CARD_LINK_SELECTOR(card)
+        href = link[0].get("href") if link else None
+        wine["url"] = urljoin(base_url, href) if href else None
+        wines.append(wine)
+    
+    return wines
+
+
+def build_wine_details(page):
+    """Turn the raw fact rows, taste bars and food pairings of a detail page into a details dict."""
+    details = {}
+    
+    # Parse each wine fact row
+    for label, value in page["facts"]:
+        label = label.strip()
         
-        # Extract rating if available
-        try:
-            rating_elem = card.find_element(By.CSS_SELECTOR, ".vivinoRating__averageValue--3p6Wp")
-            wine["rating"] = rating_elem.text.strip()
-        except NoSuchElementException:
-            wine["rating"] = None
+        key = FACT_LABEL_KEYS.get(label, label.lower().replace(" ", "_"))
+        details[key] = value.strip()
+    
+    # Extract taste characteristics (the 4 categories with percentages)
+    taste_characteristics = {}
+    for left_label, right_label, style in page["tastes"]:
+        left_label = left_label.strip()
+        right_label = right_label.strip()
         
-        # Extract price if available
+        # Extract the 'left' percentage from the progress bar style
+        match = LEFT_PERCENT_RE.search(style)
+        if match:
+            percentage = float(match.group(1))
+            # Create a key from the labels (e.g., "light_bold" or "dry_sweet")
+            key = TASTE_LABEL_KEYS.get((left_label, right_label), f"{left_label}_{right_label}".lower())
+            taste_characteristics[key] = {
+                "left_label": left_label,
+                "right_label": right_label,
+                "percentage": percentage  # 0% = left, 100% = right
+            }
+    
+    if taste_characteristics:
+        details["taste_characteristics"] = taste_characteristics
+    
+    # Extract food pairings
+    food_pairings = [food for food in page["foods"] if food]
+    
+    if food_pairings:
+        details["food_pairings"] = food_pairings
+    
+    return details
+
+
+def extract_detail_fields(html):
+    """Read the fact rows, taste bars and food pairings from detail page HTML (None if the facts table is missing)."""
+    tree = lxml.html.fromstring(html)
+    if not DETAIL_SELECTORS["facts_table"](tree):
+        return None
+    
+    facts = []
+    for row in DETAIL_SELECTORS["fact_row"](tree):
+        label = DETAIL_SELECTORS["fact_label"](row)
+        value = DETAIL_SELECTORS["fact_value"](row)
+        if label and value:
+            facts.append((element_text(label[0]), element_text(value[0])))
+    
+    tastes = []
+    for row in DETAIL_SELECTORS["taste_row"](tree):
+        properties = DETAIL_SELECTORS["taste_property"](row)
+        progress_bar = DETAIL_SELECTORS["taste_progress"](row)
+        if len(properties) >= 2 and progress_bar:
+            tastes.append((element_text(properties[0]), element_text(properties[1]),
+                           progress_bar[0].get("style", "")))
+    
+    foods = []
+    for food_elem in DETAIL_SELECTORS["food"](tree):
+        # The food name is in a div inside the link, with the image's aria-label as fallback
+        name_div = DETAIL_SELECTORS["food_name"](food_elem)
+        if name_div:
+            foods.append(element_text(name_div[0]))
+        else:
+            food_img = DETAIL_SELECTORS["food_image"](food_elem)
+            foods.append(food_img[0].get("aria-label") if food_img else None)
+    
+    return {"facts": facts, "tastes": tastes, "foods": foods}
+
+
+async def fetch_static_page(client, wine_url, semaphore):
+    """Fetch a detail page's HTML over plain HTTP (None on errors and non-200 responses)."""
+    async with semaphore:
         try:
-            price_elem = card.find_element(By.CSS_SELECTOR, ".addToCartButton__price--qJdh4")
-            wine["price"] = price_elem.text.strip()
-        except NoSuchElementException:
-            wine["price"] = None
-        
-        # Extract wine detail URL
+            response = await client.get(wine_url)
+        except httpx.HTTPError as e:
+            print(f"    Static fetch failed for {wine_url}: {e}")
+            return None
+    return response.text if response.status_code == 200 else None
+
+
+def static_client():
+    """HTTP client for detail pages, shared by all the concurrent fetches."""
+    # HTTP/2 multiplexes the requests over a few kept-alive connections instead of one handshake each
+    limits = httpx.Limits(max_connections=STATIC_CONCURRENCY, max_keepalive_connections=STATIC_CONCURRENCY)
+    return httpx.AsyncClient(http2=True, limits=limits, headers=HTTP_HEADERS, timeout=15, follow_redirects=True)
+
+
+async def fetch_all_static_pages(wine_urls):
+    """Fetch all detail pages concurrently over one shared HTTP client."""
+    semaphore = asyncio.Semaphore(STATIC_CONCURRENCY)
+    async with static_client() as client:
+        return await asyncio.gather(*(fetch_static_page(client, url, semaphore) for url in wine_urls))
+
+
+async def prefetch_static_pages(url_queue, needs_browser):
+    """Fetch detail pages into the page cache while the listing is still being scraped.
+    
+    Lists of URLs are read from url_queue until None is received. Pages that came back
+    without their details are added to needs_browser.
+    """
+    semaphore = asyncio.Semaphore(STATIC_CONCURRENCY)
+    loop = asyncio.get_running_loop()
+    # SQLite calls run on their own thread (which the connection belongs to), off the event loop
+    cache_thread = ThreadPoolExecutor(max_workers=1)
+    cache = await loop.run_in_executor(cache_thread, open_page_cache)
+    seen = set()
+    
+    async def prefetch(client, url):
+        html = await fetch_static_page(client, url, semaphore)
+        if not html:
+            return
+        if extract_detail_fields(html) is None:
+            # Rendered client-side, so fetch_all_details sends it straight to Chrome
+            needs_browser.add(url)
+        else:
+            await loop.run_in_executor(cache_thread, store_pages, cache, {url: html})
+    
+    try:
+        async with static_client() as client:
+            tasks = []
+            while (urls := await loop.run_in_executor(None, url_queue.get)) is not None:
+                new_urls = [url for url in dict.fromkeys(urls) if url not in seen]
+                seen.update(new_urls)
+                cached = await loop.run_in_executor(cache_thread, cached_urls, cache, new_urls)
+                tasks += [asyncio.create_task(prefetch(client, url)) for url in new_urls if url not in cached]
+            await asyncio.gather(*tasks)
+    finally:
+        await loop.run_in_executor(cache_thread, cache.close)
+        cache_thread.shutdown()
+
+
+def wine_from_match(match):
+    """Turn one explore API match into the same fields as a wine card."""
+    vintage = match["vintage"]
+    wine = vintage["wine"]
+    region = wine.get("region") or {}
+    country = region.get("country") or {}
+    price = match.get("price") or {}
+    rating = (vintage.get("statistics") or {}).get("ratings_average")
+    
+    url = WINE_PAGE_URL.format(seo_name=wine["seo_name"], wine_id=wine["id"])
+    query = [("year", vintage["year"])] if vintage.get("year") else []
+    if price.get("id"):
+        query.append(("price_id", price["id"]))
+    
+    # Formatted like the French site's cards (decimal commas, "16,50 €")
+    return {
+        "vineyard": (wine.get("winery") or {}).get("name"),
+        "name": f"{wine['name']} {vintage['year']}" if vintage.get("year") else wine["name"],
+        "place": ", ".join(name for name in (region.get("name"), country.get("name")) if name) or None,
+        "rating": f"{rating:.1f}".replace(".", ",") if rating else None,
+        "price": f"{price['amount']:.2f} €".replace(".", ",") if price.get("amount") else None,
+        "url": f"{url}?{urlencode(query)}" if query else url,
+    }
+
+
+def listing_page_size(start_url):
+    """Return the number of wines per explore API page for start_url."""
+    per_page = dict(parse_qsl(urlparse(start_url).query)).get("per_page", "")
+    return int(per_page) if per_page.isdigit() and int(per_page) > 0 else LISTING_PAGE_SIZE
+
+
+async def fetch_listing_page(client, start_url, page, semaphore):
+    """Fetch one page of explore results from the JSON API (None when the API refuses it)."""
+    # The API takes the same filters as the explore page URL, with the page size always sent
+    # so the page count can be worked out from records_matched
+    query = parse_qsl(urlparse(page_url(start_url, page)).query, keep_blank_values=True)
+    params = [(key, value) for key, value in query if key != "per_page"]
+    params.append(("per_page", str(listing_page_size(start_url))))
+    async with semaphore:
         try:
-            link_elem = card.find_element(By.CSS_SELECTOR, "a[data-testid='vintagePageLink']")
-            wine["url"] = link_elem.get_attribute("href")
-        except NoSuchElementException:
-            wine["url"] = None
-        
-        wines.append(wine)
+            response = await client.get(EXPLORE_API_URL, params=params + [("language", "fr")])
+        except httpx.HTTPError as e:
+            print(f"  Explore API request failed for page {page}: {e}")
+            return None
+    if response.status_code != 200:
+        return None
+    try:
+        return orjson.loads(response.content)["explore_vintage"]
+    except (orjson.JSONDecodeError, KeyError):
+        return None
+
+
+async def fetch_all_listing_pages(start_url, max_pages=None, first_page=1):
+    """Fetch the explore results pages from first_page on from the JSON API, or None if any page can't be fetched that way."""
+    semaphore = asyncio.Semaphore(LISTING_CONCURRENCY)
+    async with httpx.AsyncClient(http2=True, headers={**HTTP_HEADERS, "Accept": "application/json"},
+                                 timeout=15, follow_redirects=True) as client:
+        # The first page tells how many results there are, the rest are fetched together
+        first = await fetch_listing_page(client, start_url, first_page, semaphore)
+        if first is None or "records_matched" not in first:
+            return None
+        if not first["matches"]:
+            return []
+        # Counted from the requested page size: the first page fetched may be a short last page
+        page_count = -(-first["records_matched"] // listing_page_size(start_url))
+        if max_pages:
+            page_count = min(page_count, max_pages)
+        rest = await asyncio.gather(
+            *(fetch_listing_page(client, start_url, page, semaphore) for page in range(first_page + 1, page_count + 1))
+        )
     
-    return wines
+    results = [first, *rest]
+    if any(result is None for result in results):
+        return None
+    pages = [[wine_from_match(match) for match in result["matches"]] for result in results]
+    # Like the browser path, stop at the first empty page
+    return pages[:next((i for i, wines in enumerate(pages) if not wines), len(pages))]
+
+
+def open_page_cache(path=PAGE_CACHE_PATH):
+    """Open the on-disk detail page cache, creating it if needed."""
+    cache = sqlite3.connect(path)
+    cache.execute('''
+    CREATE TABLE IF NOT EXISTS pages (
+        url TEXT PRIMARY KEY,
+        html TEXT,
+        fetched_at INTEGER
+    )
+    ''')
+    return cache
+
+
+def select_cached_pages(cache, columns, urls):
+    """Yield the given columns of the cached pages of urls, skipping pages older than PAGE_CACHE_TTL_SECONDS."""
+    cutoff = int(time.time()) - PAGE_CACHE_TTL_SECONDS
+    urls = list(dict.fromkeys(urls))
+    # Looked up by primary key a chunk at a time, so the cost follows the URLs asked for, not the cache size
+    for start in range(0, len(urls), PAGE_CACHE_QUERY_CHUNK):
+        chunk = urls[start:start + PAGE_CACHE_QUERY_CHUNK]
+        placeholders = ", ".join("?" * len(chunk))
+        yield from cache.execute(
+            f'SELECT {columns} FROM pages WHERE url IN ({placeholders}) AND fetched_at > ?',
+            (*chunk, cutoff),
+        )
+
+
+def load_cached_pages(cache, urls):
+    """Load the cached HTML of the given URLs, skipping pages older than PAGE_CACHE_TTL_SECONDS."""
+    return dict(select_cached_pages(cache, "url, html", urls))
+
+
+def cached_urls(cache, urls):
+    """Return which of the given URLs have a fresh page in the cache, without loading the HTML."""
+    return {url for url, in select_cached_pages(cache, "url", urls)}
+
+
+def store_pages(cache, pages):
+    """Save detail page HTML to the cache, keyed by URL."""
+    now = int(time.time())
+    with cache:
+        cache.executemany(
+            'INSERT OR REPLACE INTO pages (url, html, fetched_at) VALUES (?, ?, ?)',
+            [(url, html, now) for url, html in pages.items()],
+        )
 
 
 def parse_wine_details(driver, wine_url):
-    """Parse detailed wine information from the wine's detail page."""
-    details = {}
-    
+    """Parse detailed wine information from the wine's detail page, returning it with the page HTML."""
     try:
         driver.get(wine_url)
-        time.sleep(2)
         
         # Wait for wine facts table
         try:
@@ -125,105 +611,93 @@ def parse_wine_details(driver, wine_url):
                 EC.presence_of_element_located((By.CSS_SELECTOR, ".wineFacts__wineFacts--2Ih8B"))
             )
         except TimeoutException:
-            return details
-        
-        # Parse each wine fact row
-        rows = driver.find_elements(By.CSS_SELECTOR, "[data-testid='wineFactRow']")
-        for row in rows:
-            try:
-                label = row.find_element(By.CSS_SELECTOR, ".wineFacts__headerLabel--14doB").text.strip()
-                value = row.find_element(By.CSS_SELECTOR, ".wineFacts__fact--3BAsi").text.strip()
-                
-                # Map French labels to English keys
-                label_map = {
-                    "Domaine viticole": "winery",
-                    "Cépages": "grapes",
-                    "Région": "region",
-                    "Style de vin": "wine_style",
-                    "Allergènes": "allergens",
-                    "Description du vin": "description",
-                }
-                
-                key = label_map.get(label, label.lower().replace(" ", "_"))
-                details[key] = value
-            except NoSuchElementException:
-                pass
+            return {}, None
         
-        # Extract taste characteristics (the 4 categories with percentages)
-        taste_characteristics = {}
-        try:
-            taste_rows = driver.find_elements(By.CSS_SELECTOR, ".tasteStructure__tasteCharacteristic--jLtsE")
-            for taste_row in taste_rows:
-                # Get the left and right property labels
-                properties = taste_row.find_elements(By.CSS_SELECTOR, ".tasteStructure__property--CLNl_")
-                if len(properties) >= 2:
-                    left_label = properties[0].text.strip()
-                    right_label = properties[1].text.strip()
-                    
-                    # Get the percentage from the progress bar style
-                    try:
-                        progress_bar = taste_row.find_element(By.CSS_SELECTOR, ".indicatorBar__progress--3aXLX")
-                        style = progress_bar.get_attribute("style")
-                        # Extract the 'left' percentage (e.g., "left: 72.7135%;")
-                        match = re.search(r'left:\s*([\d.]+)%', style)
-                        if match:
-                            percentage = float(match.group(1))
-                            # Create a key from the labels (e.g., "light_bold" or "dry_sweet")
-                            label_key_map = {
-                                ("Léger", "Puissant"): "light_bold",
-                                ("Souple", "Tannique"): "smooth_tannic",
-                                ("Sec", "Moelleux"): "dry_sweet",
-                                ("Doux", "Acide"): "soft_acidic",
-                                # English versions
-                                ("Light", "Bold"): "light_bold",
-                                ("Smooth", "Tannic"): "smooth_tannic",
-                                ("Dry", "Sweet"): "dry_sweet",
-                                ("Soft", "Acidic"): "soft_acidic",
-                            }
-                            key = label_key_map.get((left_label, right_label), f"{left_label}_{right_label}".lower())
-                            taste_characteristics[key] = {
-                                "left_label": left_label,
-                                "right_label": right_label,
-                                "percentage": percentage  # 0% = left, 100% = right
-                            }
-                    except NoSuchElementException:
-                        pass
-        except Exception as e:
-            print(f"    Error extracting taste characteristics: {e}")
+        # Grab the rendered page once and parse it offline, like the static fetches
+        html = driver.page_source
+        page = extract_detail_fields(html)
+        if page is not None:
+            return build_wine_details(page), html
+    
+    except Exception as e:
+        print(f"    Error fetching details: {e}")
+    
+    return {}, None
+
+
+def fetch_all_details(slots, wines, workers=BROWSER_WORKERS, headless=False, needs_browser=()):
+    """Fetch detail pages from the cache or over plain HTTP, falling back to a pool of browsers for the rest.
+    
+    URLs in needs_browser are already known to need Chrome and aren't fetched over HTTP again.
+    """
+    # The same wine can show up on several listing pages, so each URL is fetched once
+    wines_by_url = {}
+    for wine in wines:
+        if wine.get("url"):
+            wines_by_url.setdefault(wine["url"], []).append(wine)
+    to_fetch = [same_url[0] for same_url in wines_by_url.values()]
+    if not to_fetch:
+        return
+    
+    # Pages from a previous run are parsed straight from the cache
+    cache = open_page_cache()
+    try:
+        pages = load_cached_pages(cache, [wine["url"] for wine in to_fetch])
+        print(f"  {len(pages)} pages found in the cache")
         
-        if taste_characteristics:
-            details["taste_characteristics"] = taste_characteristics
+        # The facts, taste bars and pairings are server-rendered, so most pages don't need Chrome
+        missing = [wine["url"] for wine in to_fetch if wine["url"] not in pages and wine["url"] not in needs_browser]
+        fetched = dict(zip(missing, asyncio.run(fetch_all_static_pages(missing))))
         
-        # Extract food pairings
-        food_pairings = []
+        new_pages = {}
+        left = []
+        for wine in to_fetch:
+            url = wine["url"]
+            html = pages.get(url) or fetched.get(url)
+            page = extract_detail_fields(html) if html else None
+            if page is None:
+                left.append(wine)
+                continue
+            wine.update(build_wine_details(page))
+            if url not in pages:
+                new_pages[url] = html
+        store_pages(cache, new_pages)
+        print(f"  {len(new_pages)} pages fetched without a browser, {len(left)} left for Chrome")
+        if left:
+            start_browsers(slots, min(workers, len(left)), headless)
+            fetch_details_with_browsers([slot["driver"] for slot in slots], left, cache)
+    finally:
+        cache.close()
+    
+    # Copy the fetched details to the other listings of the same wine
+    for fetched_wine, *duplicates in wines_by_url.values():
+        for duplicate in duplicates:
+            duplicate.update({key: value for key, value in fetched_wine.items() if key not in duplicate})
+
+
+def fetch_details_with_browsers(drivers, to_fetch, cache):
+    """Fetch detail pages in parallel, each worker thread borrowing a driver from a shared pool."""
+    free_drivers = queue.Queue()
+    for driver in drivers:
+        free_drivers.put(driver)
+    
+    def fetch(indexed_wine):
+        i, wine = indexed_wine
+        if i < len(drivers):
+            time.sleep(i * WORKER_STAGGER_SECONDS)
+        worker_driver = free_drivers.get()
         try:
-            food_elements = driver.find_elements(By.CSS_SELECTOR, ".foodPairing__imageContainer--2CtYR")
-            for food_elem in food_elements:
-                try:
-                    # The food name is in a div inside the link
-                    food_name_div = food_elem.find_element(By.CSS_SELECTOR, "div:not([role='img'])")
-                    food_name = food_name_div.text.strip()
-                    if food_name:
-                        food_pairings.append(food_name)
-                except NoSuchElementException:
-                    # Try getting the aria-label from the image as fallback
-                    try:
-                        food_img = food_elem.find_element(By.CSS_SELECTOR, "[role='img']")
-                        food_name = food_img.get_attribute("aria-label")
-                        if food_name:
-                            food_pairings.append(food_name)
-                    except NoSuchElementException:
-                        pass
-        except Exception as e:
-            print(f"    Error extracting food pairings: {e}")
-        
-        if food_pairings:
-            details["food_pairings"] = food_pairings
-                
-    except Exception as e:
-        print(f"    Error fetching details: {e}")
+            return parse_wine_details(worker_driver, wine["url"])
+        finally:
+            free_drivers.put(worker_driver)
     
-    return details
+    with ThreadPoolExecutor(max_workers=len(drivers)) as pool:
+        # Results come back in order, so progress still prints one wine at a time
+        for i, (wine, (details, html)) in enumerate(zip(to_fetch, pool.map(fetch, enumerate(to_fetch)))):
+            print(f"  [{i+1}/{len(to_fetch)}] {wine.get('vineyard', '')} - {wine.get('name', '')}")
+            wine.update(details)
+            if html:
+                store_pages(cache, {wine["url"]: html})
 
 
 def dismiss_cookie_consent(driver, force=False):
@@ -233,56 +707,27 @@ def dismiss_cookie_consent(driver, force=False):
         driver: Selenium WebDriver instance
         force: If True, attempt dismissal even if already done (for edge cases)
     """
-    global _cookies_dismissed
-    
-    # Skip if already dismissed (saves ~3s per page)
-    if _cookies_dismissed and not force:
+    # Skip if already dismissed in this browser, the banner doesn't come back (saves ~3s per page)
+    if getattr(driver, "_consent_done", False) and not force:
         return True
     
     try:
-        # Wait briefly for consent banner to appear (only on first attempt)
-        time.sleep(0.5)
-        
-        # Try various cookie consent buttons (Accept is better - sets proper cookies)
-        selectors = [
-            "#onetrust-accept-btn-handler",  # OneTrust Accept All
-            "#onetrust-reject-all-handler",  # OneTrust Reject All  
-            "button[title='Accept All']",
-            "button[title='Reject All']",
-            ".onetrust-close-btn-handler",
-            "#accept-cookies",
-            "[data-testid='acceptCookies']",
-        ]
+        # Click the first consent button found, or remove the overlay, in one round-trip
+        result = driver.execute_script(CONSENT_JS, CONSENT_SELECTORS)
         
-        for sel in selectors:
+        if result["clicked"]:
+            print(f"  Found consent button: {result['clicked']}")
+            # Wait for the banner to close, which is when the cookies are set
             try:
-                btns = driver.find_elements(By.CSS_SELECTOR, sel)
-                if btns:
-                    print(f"  Found consent button: {sel}")
-                    driver.execute_script("arguments[0].click();", btns[0])
-                    time.sleep(1.5)  # Wait for cookies to be set
-                    _cookies_dismissed = True
-                    return True
-            except:
+                WebDriverWait(driver, 5).until(
+                    EC.invisibility_of_element_located((By.ID, "onetrust-banner-sdk"))
+                )
+            except TimeoutException:
                 pass
+        elif result["removed"]:
+            print("  No consent button found, removed overlay")
         
-        # No button found - either already dismissed or doesn't exist
-        # Check if banner exists before trying to remove
-        has_banner = driver.execute_script("""
-            return !!(document.getElementById('consent-blocker') || 
-                     document.getElementById('onetrust-consent-sdk'));
-        """)
-        
-        if has_banner:
-            print("  No consent button found, removing overlay...")
-            driver.execute_script("""
-                var blocker = document.getElementById('consent-blocker');
-                if (blocker) blocker.remove();
-                var onetrust = document.getElementById('onetrust-consent-sdk');
-                if (onetrust) onetrust.remove();
-            """)
-        
-        _cookies_dismissed = True
+        driver._consent_done = True
         return True
         
     except Exception as e:
@@ -290,52 +735,131 @@ def dismiss_cookie_consent(driver, force=False):
     return False
 
 
-def go_to_next_page(driver):
-    """Click the next page button. Returns True if successful, False if no next page."""
+def page_url(start_url, page):
+    """Return the explore URL for the given results page."""
+    parts = urlparse(start_url)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != "page"]
+    query.append(("page", str(page)))
+    return urlunparse(parts._replace(query=urlencode(query)))
+
+
+def open_first_page(driver, url):
+    """Load the first page of a browser session and dismiss the cookie consent."""
+    driver.get(url)
+    # Go on as soon as either the cards or the consent banner have rendered
     try:
-        dismiss_cookie_consent(driver)
-        
-        # Try multiple selectors for the Next button
-        selectors = [
-            ".searchPagination-module__next--1Lpry a",
-            "a[href*='page=2']",
-            "a[href*='page=']",
-        ]
-        
-        next_button = None
-        for sel in selectors:
-            try:
-                buttons = driver.find_elements(By.CSS_SELECTOR, sel)
-                print(f"  DEBUG: Selector '{sel}' found {len(buttons)} elements")
-                if buttons:
-                    # For page= links, find the "next" one
-                    for btn in buttons:
-                        href = btn.get_attribute("href")
-                        text = btn.text.strip()
-                        print(f"    -> href: {href}, text: '{text}'")
-                        if "Suivant" in text or (href and "page=" in href):
-                            next_button = btn
-                            break
-                if next_button:
-                    break
-            except:
-                pass
-        
-        if next_button:
-            # Scroll to button and click (maintains session, avoids 405 error)
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
-            time.sleep(0.3)
-            driver.execute_script("arguments[0].click();", next_button)
-            time.sleep(2)  # Reduced from 3s - WebDriverWait handles slow loads
-            return True
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "[data-testid='wineCard'], #onetrust-consent-sdk"))
+        )
+    except TimeoutException:
+        pass
+    dismiss_cookie_consent(driver)  # Dismiss OneTrust consent modal (once per browser)
+
+
+def start_browsers(slots, count, headless=False):
+    """Start browsers until the pool has at least count of them."""
+    # Chrome's cold start is mostly waiting, so the browsers are launched side by side
+    missing = count - len(slots)
+    if missing <= 0:
+        return
+    with ThreadPoolExecutor(max_workers=missing) as pool:
+        futures = [pool.submit(create_driver, headless) for _ in range(missing)]
+    # Browsers that did start go in the pool even if another failed, so they still get quit
+    for future in futures:
+        if future.exception() is None:
+            slots.append({"driver": future.result(), "pages": 0, "headless": headless})
+    for future in futures:
+        if future.exception() is not None:
+            raise future.exception()
+
+
+def add_page_wines(all_wines, page, wines, on_page=None):
+    """Add a listing page's wines from the allowed countries to the results."""
+    print(f"Scraping page {page}...")
+    
+    # Filter to only keep wines from France, Italy, and Spain
+    wines_before_filter = len(wines)
+    wines = [w for w in wines if is_wine_from_allowed_country(w)]
+    print(f"  Found {wines_before_filter} wines, kept {len(wines)} (France/Italy/Spain only)")
+    
+    all_wines.extend(wines)
+    print(f"  Total so far: {len(all_wines)}")
+    
+    if on_page is not None:
+        on_page(page, wines)
+
+
+def scrape_listing_page(slot, start_url, page):
+    """Load one explore results page in a pooled browser and parse its wine cards."""
+    url = page_url(start_url, page)
+    # Restart the browser every so often so its memory doesn't keep growing over a long scrape
+    if slot["pages"] >= DRIVER_RECYCLE_PAGES:
+        print("  Restarting a browser")
+        slot["driver"].quit()
+        slot["driver"] = create_driver(slot["headless"])
+        slot["pages"] = 0
+    
+    if slot["pages"] == 0:
+        open_first_page(slot["driver"], url)
+    else:
+        slot["driver"].get(url)
+    slot["pages"] += 1
+    return parse_wine_cards(slot["driver"])
+
+
+def scrape_listing_with_browsers(slots, start_url, max_pages, all_wines, on_page=None, first_page=1):
+    """Scrape explore results pages in parallel, each browser used by one worker thread at a time."""
+    workers = len(slots)
+    free_slots = queue.Queue()
+    for slot in slots:
+        free_slots.put(slot)
+    
+    def scrape_page(page):
+        if page < first_page + workers:
+            time.sleep((page - first_page) * WORKER_STAGGER_SECONDS)
+        slot = free_slots.get()
+        try:
+            return scrape_listing_page(slot, start_url, page)
+        finally:
+            free_slots.put(slot)
+    
+    page_count = first_page - 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            # The last page isn't known up front, so pages are loaded one batch per browser at a time
+            last_page = page_count + workers
+            if max_pages:
+                last_page = min(last_page, max_pages)
+            batch = range(page_count + 1, last_page + 1)
             
-    except (NoSuchElementException, TimeoutException) as e:
-        print(f"  DEBUG: Exception: {e}")
-        return False
-    return False
+            for page_count, wines in zip(batch, pool.map(scrape_page, batch)):
+                # An empty page means we went past the last one
+                if not wines:
+                    print(f"Scraping page {page_count}...")
+                    print("No more pages available")
+                    return
+                
+                add_page_wines(all_wines, page_count, wines, on_page)
+                
+                # Check if we've reached max pages
+                if max_pages and page_count >= max_pages:
+                    print(f"Reached maximum pages limit ({max_pages})")
+                    return
+
+
+@contextmanager
+def browser_pool():
+    """Share browsers across several scrape_vivino calls, quitting them all at the end."""
+    slots = []
+    try:
+        yield slots
+    finally:
+        for slot in slots:
+            slot["driver"].quit()
 
 
-def scrape_vivino(start_url, max_pages=None, detailed=False):
+def scrape_vivino(start_url, max_pages=None, detailed=False, workers=BROWSER_WORKERS, on_page=None,
+                  headless=False, first_page=1, previous_wines=(), slots=None):
     """
     Scrape wine data from Vivino starting from the given URL.
     
@@ -343,79 +867,141 @@ def scrape_vivino(start_url, max_pages=None, detailed=False):
         start_url: The Vivino explore URL to start from
         max_pages: Maximum number of pages to scrape (None for all pages)
         detailed: If True, fetch additional details from each wine's page
+        workers: Number of browsers scraping pages in parallel
+        on_page: Called with (page, wines) as each listing page is added
+        headless: If True, run Chrome without a window
+        first_page: Listing page to start from (when resuming)
+        previous_wines: Wines of the pages before first_page
+        slots: Browser pool from browser_pool() to reuse (by default the browsers are quit at the end)
     
     Returns:
         List of wine dictionaries
     """
-    global _cookies_dismissed
-    _cookies_dismissed = False  # Reset for new session
+    # Browsers are only started when a page can't be fetched over plain HTTP
+    own_slots = slots is None
+    if own_slots:
+        slots = []
+    all_wines = list(previous_wines)
+    
+    # With details, the detail pages are downloaded into the page cache while the listing goes on
+    detail_urls = queue.Queue() if detailed else None
+    needs_browser = set()  # Pages the prefetcher found rendered client-side
+    prefetcher = None
+    if detailed:
+        prefetcher = threading.Thread(target=asyncio.run, args=(prefetch_static_pages(detail_urls, needs_browser),))
     
-    driver = create_driver()
-    all_wines = []
-    page_count = 0
+    def handle_page(page, wines):
+        if on_page is not None:
+            on_page(page, wines)
+        # Hand the detail pages to the prefetcher right away
+        if detail_urls is not None:
+            detail_urls.put([wine["url"] for wine in wines if wine.get("url")])
     
     try:
         print(f"Starting scrape from: {start_url}")
-        driver.get(start_url)
-        time.sleep(2)  # Initial page load (reduced from 3s)
-        dismiss_cookie_consent(driver)  # Dismiss OneTrust consent modal
+        if prefetcher:
+            prefetcher.start()
+            detail_urls.put([wine["url"] for wine in all_wines if wine.get("url")])
         
-        while True:
-            page_count += 1
-            print(f"Scraping page {page_count}...")
-            
-            # Parse wines on current page
-            wines = parse_wine_cards(driver)
-            
-            # Filter to only keep wines from France, Italy, and Spain
-            wines_before_filter = len(wines)
-            wines = [w for w in wines if is_wine_from_allowed_country(w)]
-            print(f"  Found {wines_before_filter} wines, kept {len(wines)} (France/Italy/Spain only)")
-            
-            all_wines.extend(wines)
-            print(f"  Total so far: {len(all_wines)}")
-            
-            # Check if we've reached max pages
-            if max_pages and page_count >= max_pages:
+        try:
+            if first_page > 1:
+                print(f"Resuming from page {first_page} with {len(all_wines)} wines")
+            if max_pages and first_page > max_pages:
                 print(f"Reached maximum pages limit ({max_pages})")
-                break
-            
-            # Try to go to next page
-            if not go_to_next_page(driver):
-                print("No more pages available")
-                break
+            else:
+                # The explore API returns the cards' data as JSON, so Chrome is only the fallback
+                pages = asyncio.run(fetch_all_listing_pages(start_url, max_pages, first_page))
+                if pages is not None:
+                    print(f"Fetched {len(pages)} pages from the explore API")
+                    for page, wines in enumerate(pages, start=first_page):
+                        add_page_wines(all_wines, page, wines, handle_page)
+                else:
+                    print("Explore API unavailable, scraping the pages with Chrome")
+                    page_total = max_pages - first_page + 1 if max_pages else workers
+                    start_browsers(slots, min(workers, page_total), headless)
+                    scrape_listing_with_browsers(slots, start_url, max_pages, all_wines, handle_page, first_page)
+        finally:
+            if prefetcher:
+                detail_urls.put(None)
+                prefetcher.join()
         
         # Fetch detailed info for each wine if requested
         if detailed:
             print(f"\nFetching detailed info for {len(all_wines)} wines...")
-            for i, wine in enumerate(all_wines):
-                if wine.get("url"):
-                    print(f"  [{i+1}/{len(all_wines)}] {wine.get('vineyard', '')} - {wine.get('name', '')}")
-                    details = parse_wine_details(driver, wine["url"])
-                    wine.update(details)
-                    time.sleep(1)  # Be nice to the server
+            fetch_all_details(slots, all_wines, workers=workers, headless=headless, needs_browser=needs_browser)
             
     except Exception as e:
         print(f"Error during scraping: {e}")
     finally:
-        driver.quit()
+        if own_slots:
+            for slot in slots:
+                slot["driver"].quit()
     
     return all_wines
 
 
+def save_checkpoint(start_url, page, wine_count):
+    """Record the last listing page whose wines are all in the partial output file."""
+    # Written to a temporary file first so a crash never leaves half a checkpoint
+    with open(CHECKPOINT_FILE + ".tmp", "wb") as f:
+        f.write(orjson.dumps({"url": start_url, "page": page, "wines": wine_count}))
+    os.replace(CHECKPOINT_FILE + ".tmp", CHECKPOINT_FILE)
+
+
+def load_checkpoint(start_url):
+    """Return the last completed listing page of an interrupted run of start_url and its wines (0 and [] if none)."""
+    try:
+        with open(CHECKPOINT_FILE, "rb") as f:
+            checkpoint = orjson.loads(f.read())
+        with open(PARTIAL_OUTPUT_FILE, "rb") as f:
+            # Lines past the checkpoint belong to a page that wasn't finished
+            lines = f.read().splitlines()[:checkpoint["wines"]]
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return 0, []
+    if checkpoint["url"] != start_url or len(lines) < checkpoint["wines"]:
+        return 0, []
+    return checkpoint["page"], [orjson.loads(line) for line in lines]
+
+
 def main():
     parser = argparse.ArgumentParser(description="Scrape wine data from Vivino")
     parser.add_argument("--detailed", action="store_true", 
                         help="Fetch additional details (grapes, region, style, etc.) from each wine's page")
     parser.add_argument("--max-pages", type=int, default=10,
                         help="Maximum number of pages to scrape (default: 10)")
+    parser.add_argument("--workers", type=int, default=BROWSER_WORKERS,
+                        help=f"Number of browsers scraping pages in parallel (default: {BROWSER_WORKERS})")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run Chrome without a window (uses less memory, may trip bot detection)")
     parser.add_argument("--url", type=str,
-                        default="https://www.vivino.com/fr/explore?e=eJxLKbBNS8wpTlXLLbI11rNQy83MszVXy02ssDUzUEu2dQ0NUiuwNVQrS7ZVyy9KsU1JLU5Wy0-qtE1KLS6JL8hMzi5WK7fNK83JUSsviY4FqgRTRgDfaRz2",
+                        default=DEFAULT_URL,
                         help="Vivino explore URL to start from")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted scrape of the same URL after its last saved page")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Print the results and indent the output file")
     args = parser.parse_args()
     
-    # Scrape wines
-    wines = scrape_vivino(args.url, max_pages=args.max_pages, detailed=args.detailed)
+    last_page, previous_wines = load_checkpoint(args.url) if args.resume else (0, [])
+    
+    # Scrape wines (the listing results are also streamed to the partial output file)
+    wine_count = 0
+    with open(PARTIAL_OUTPUT_FILE, "wb") as partial_file:
+        def save_page(page, wines):
+            nonlocal wine_count
+            # One JSON object per line, flushed so it is on disk even if the run dies later
+            partial_file.write(b"".join(orjson.dumps(wine) + b"\n" for wine in wines))
+            partial_file.flush()
+            wine_count += len(wines)
+            save_checkpoint(args.url, page, wine_count)
+        
+        # The resumed wines are written back first, dropping anything past the checkpoint
+        if previous_wines:
+            save_page(last_page, previous_wines)
+        
+        wines = scrape_vivino(args.url, max_pages=args.max_pages, detailed=args.detailed,
+                              workers=args.workers, on_page=save_page, headless=args.headless,
+                              first_page=last_page + 1, previous_wines=previous_wines)
     
     # Output as JSON
     result = {
@@ -423,15 +1009,18 @@ def main():
         "wines": wines
     }
     
-    print("\n" + "="*50)
-    print("RESULTS (JSON):")
-    print("="*50)
-    print(json.dumps(result, indent=2, ensure_ascii=False))
+    # Compact UTF-8 by default, indented (and echoed) only when asked for
+    output = orjson.dumps(result, option=orjson.OPT_INDENT_2 if args.verbose else 0)
+    if args.verbose:
+        print("\n" + "="*50)
+        print("RESULTS (JSON):")
+        print("="*50)
+        print(output.decode())
     
-    # Also save to file
-    with open("../data/vivino_wines.json", "w", encoding="utf-8") as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
-    print(f"\nResults saved to ../data/vivino_wines.json")
+    # Save to file
+    with open(OUTPUT_FILE, "wb") as f:
+        f.write(output)
+    print(f"\nResults saved to {OUTPUT_FILE}")
     
     return result
 